@@ -0,0 +1,28 @@
+-- 0003_corp_actions.tmpl.sql — equity 조정계수(분할/배당)
+USE `econ_sim`;
+
+-- corp_action: 기업행위 원본 + 반영 상태
+--   ex_date: 권리락 거래일. equity 1d 바는 UTC 자정 right-close 라벨이므로 ts <= ex_date(자정)인 바가 조정 대상
+--   factor : 현재 equity_bars.adj_factor에 곱해져 있는 배수(NULL = 아직 미반영)
+--   applied_ts: 반영 시각. 원본(ratio/amount)이 바뀌면 NULL로 되돌아가고 다음 실행 때 (새 배수 / factor)만 추가로 곱한다
+CREATE TABLE IF NOT EXISTS `corp_action` (
+  `asset_id`    INT                        NOT NULL,
+  `ex_date`     DATE                       NOT NULL,
+  `kind`        ENUM('split','dividend')   NOT NULL,
+  `ratio`       DOUBLE                     NULL,   -- split: 새 주식수/기존 주식수 (2:1 분할 = 2.0)
+  `amount`      DOUBLE                     NULL,   -- dividend: 주당 현금배당(바와 같은 통화)
+  `factor`      DOUBLE                     NULL,
+  `applied_ts`  DATETIME                   NULL,
+  `provider`    VARCHAR(16)                NULL,
+  `ingest_ts`   DATETIME                   NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`asset_id`,`ex_date`,`kind`),
+  KEY `k_pending` (`asset_id`,`applied_ts`),
+  CONSTRAINT `fk_corp_action_asset`
+    FOREIGN KEY (`asset_id`) REFERENCES `asset`(`asset_id`)
+    ON UPDATE CASCADE ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 반복 곱에서 DECIMAL 반올림이 누적되지 않도록 조정열을 DOUBLE로
+ALTER TABLE `equity_bars`
+  MODIFY `adj_factor` DOUBLE NULL DEFAULT 1,
+  MODIFY `adj_close`  DOUBLE NULL;
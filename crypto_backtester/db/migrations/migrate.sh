@@ -28,9 +28,11 @@ fi
 
 render "$MIG_DIR/0001_init.tmpl.sql"       "$RENDER_DIR/$DB_NAME/0001_init.$DB_NAME.sql"
 render "$MIG_DIR/0002_partitions.tmpl.sql" "$RENDER_DIR/$DB_NAME/0002_partitions.$DB_NAME.sql"
+render "$MIG_DIR/0003_corp_actions.tmpl.sql" "$RENDER_DIR/$DB_NAME/0003_corp_actions.$DB_NAME.sql"
 
 mysql -h "$DB_HOST" -P "$DB_PORT" -u "$DB_USER" -p"$DB_PASS" < "$RENDER_DIR/$DB_NAME/0001_init.$DB_NAME.sql"
 mysql -h "$DB_HOST" -P "$DB_PORT" -u "$DB_USER" -p"$DB_PASS" < "$RENDER_DIR/$DB_NAME/0002_partitions.$DB_NAME.sql"
+mysql -h "$DB_HOST" -P "$DB_PORT" -u "$DB_USER" -p"$DB_PASS" < "$RENDER_DIR/$DB_NAME/0003_corp_actions.$DB_NAME.sql"
 
 # 검증
 mysql -h "$DB_HOST" -P "$DB_PORT" -u "$DB_USER" -p"$DB_PASS" -e "SHOW TABLES FROM \`$DB_NAME\`;"
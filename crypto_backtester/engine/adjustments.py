@@ -0,0 +1,188 @@
+from __future__ import annotations
+from typing import Any, Dict
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from crypto_backtester.engine.db_utils import DB_NAME
+
+# equity 1d 후방 조정(back-adjustment)
+#   - 행위 k의 배수 m_k: split → 1/ratio, dividend → 1 - amount / (권리락 직전 원시 종가)
+#   - 바 t의 누적 계수 = ts_t <= ex_date_k 인 모든 k의 m_k 곱 (최신 바는 1)
+#   - 조정 OHLC = 원시 × adj_factor (거래량은 원시 유지)
+# 곱은 교환법칙이 성립하므로 새 행위는 "해당 ex_date 이전 바에 m_k를 한 번 곱하기"로 증분 반영된다.
+SPLIT, DIVIDEND = "split", "dividend"
+RES = "1d"
+
+# --------- 계수 계산(순수 함수) ---------
+def _ns(values) -> np.ndarray:
+    idx = pd.DatetimeIndex(pd.to_datetime(values))
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("ns").asi8
+
+def prev_close(ts, close, ex_dates) -> np.ndarray:
+    """각 ex_date의 권리락 직전 원시 종가(= ts <= ex_date 인 마지막 바). 없으면 NaN."""
+    t, e = _ns(ts), _ns(ex_dates)
+    c = np.asarray(close, dtype=np.float64)
+    pos = np.searchsorted(t, e, side="right") - 1
+    out = np.full(len(e), np.nan)
+    ok = pos >= 0
+    out[ok] = c[pos[ok]]
+    return out
+
+def action_multipliers(kind, ratio, amount, ref_close) -> np.ndarray:
+    """
+    행위별 배수. ref_close는 dividend에만 쓰인다(prev_close 결과).
+    값이 없거나 비정상(ratio<=0, 배당>=종가, 기준 종가 없음)이면 1(조정 안 함).
+    """
+    kind = np.asarray(kind, dtype=object)
+    ratio = np.asarray(ratio, dtype=np.float64)
+    amount = np.asarray(amount, dtype=np.float64)
+    ref = np.asarray(ref_close, dtype=np.float64)
+    m = np.ones(len(kind))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        split = (kind == SPLIT) & (ratio > 0)
+        m[split] = 1.0 / ratio[split]
+        div = (kind == DIVIDEND) & (amount > 0) & (ref > amount)
+        m[div] = 1.0 - amount[div] / ref[div]
+    return m
+
+def adjustment_factors(ts, ex_dates, multipliers) -> np.ndarray:
+    """
+    바별 누적 계수. ex_date 오름차순 정렬 후 배수의 역방향 누적곱 S[j] = m_j·…·m_{K-1} (S[K]=1)을 만들고,
+    바 t에는 ex_date < ts 인 행위 개수 j(t)로 S[j(t)]를 준다(searchsorted 1회).
+    """
+    e = _ns(ex_dates)
+    m = np.asarray(multipliers, dtype=np.float64)
+    order = np.argsort(e, kind="stable")
+    e, m = e[order], m[order]
+    suffix = np.ones(len(m) + 1)
+    suffix[:-1] = np.cumprod(m[::-1])[::-1]
+    return suffix[np.searchsorted(e, _ns(ts), side="left")]
+
+# --------- DB ---------
+def upsert_corp_actions(engine, asset_id: int, df: pd.DataFrame, provider: str | None = None) -> int:
+    """
+    df: ex_date, kind, ratio, amount. 원본 값이 바뀐 행은 applied_ts를 NULL로 되돌린다
+    (factor는 유지 → 다음 apply에서 새 배수/기존 factor만 추가로 곱함).
+    """
+    if df.empty:
+        return 0
+    records = [{
+        "aid": asset_id, "ex": pd.Timestamp(r.ex_date).date(), "kind": str(r.kind),
+        "ratio": None if pd.isna(getattr(r, "ratio", None)) else float(r.ratio),
+        "amount": None if pd.isna(getattr(r, "amount", None)) else float(r.amount),
+        "provider": provider,
+    } for r in df.itertuples(index=False)]
+    q = text(f"""
+        INSERT INTO `{DB_NAME}`.corp_action (asset_id, ex_date, kind, ratio, amount, provider)
+        VALUES (:aid, :ex, :kind, :ratio, :amount, :provider)
+        ON DUPLICATE KEY UPDATE
+          applied_ts=IF(ratio <=> VALUES(ratio) AND amount <=> VALUES(amount), applied_ts, NULL),
+          ratio=VALUES(ratio), amount=VALUES(amount), provider=VALUES(provider)
+    """)
+    with engine.begin() as conn:
+        conn.execute(q, records)
+    return len(records)
+
+def load_corp_actions(engine, asset_id: int, pending_only: bool = False) -> pd.DataFrame:
+    cond = " AND applied_ts IS NULL" if pending_only else ""
+    with engine.begin() as conn:
+        rows = conn.execute(text(f"""
+            SELECT ex_date, kind, ratio, amount, factor, applied_ts
+            FROM `{DB_NAME}`.corp_action WHERE asset_id=:aid{cond}
+            ORDER BY ex_date, kind
+        """), {"aid": asset_id}).fetchall()
+    return pd.DataFrame(rows, columns=["ex_date", "kind", "ratio", "amount", "factor", "applied_ts"])
+
+_FILL_NEW_SQL = f"""
+    UPDATE `{DB_NAME}`.equity_bars b
+    SET b.adj_factor = COALESCE((
+          SELECT EXP(SUM(LN(ca.factor))) FROM `{DB_NAME}`.corp_action ca
+          WHERE ca.asset_id=b.asset_id AND ca.factor IS NOT NULL AND b.ts <= ca.ex_date), 1),
+        b.adj_close = b.close * b.adj_factor
+    WHERE b.asset_id=:aid AND b.res=:res AND b.adj_close IS NULL
+"""
+
+_SCALE_SQL = f"""
+    UPDATE `{DB_NAME}`.equity_bars
+    SET adj_factor = COALESCE(adj_factor, 1) * :delta, adj_close = close * adj_factor
+    WHERE asset_id=:aid AND res=:res AND ts <= :ex
+"""
+
+_MARK_SQL = f"""
+    UPDATE `{DB_NAME}`.corp_action SET factor=:factor, applied_ts=UTC_TIMESTAMP()
+    WHERE asset_id=:aid AND ex_date=:ex AND kind=:kind
+"""
+
+def apply_adjustments(engine, asset_id: int) -> Dict[str, Any]:
+    """
+    증분 반영(한 트랜잭션):
+      1) adj_close가 NULL인 바(새로 적재/재적재) → 이미 반영된 행위 factor들의 곱으로 채움
+      2) 미반영 행위마다 ts <= ex_date 인 바에 (새 배수 / 기존 factor)를 곱함 — 집합 UPDATE 1회
+    최신 행위 이후의 새 바는 1)에서 계수 1로 채워지고 기존 바는 건드리지 않는다.
+    권리락 직전 바가 아직 없는 dividend는 배수를 정할 수 없으므로 미반영(applied_ts NULL)으로 남겨
+    히스토리를 백필한 뒤 다시 실행하면 반영된다(deferred).
+    """
+    pending = load_corp_actions(engine, asset_id, pending_only=True)
+    with engine.begin() as conn:
+        filled = conn.execute(text(_FILL_NEW_SQL), {"aid": asset_id, "res": RES}).rowcount
+        scaled = deferred = 0
+        for r in pending.itertuples(index=False):
+            ref = np.nan
+            if r.kind == DIVIDEND:
+                row = conn.execute(text(f"""
+                    SELECT close FROM `{DB_NAME}`.equity_bars
+                    WHERE asset_id=:aid AND res=:res AND ts <= :ex ORDER BY ts DESC LIMIT 1
+                """), {"aid": asset_id, "res": RES, "ex": r.ex_date}).fetchone()
+                ref = float(row[0]) if row and row[0] is not None else np.nan
+                if np.isnan(ref):
+                    deferred += 1
+                    continue
+            m = float(action_multipliers([r.kind], [r.ratio], [r.amount], [ref])[0])
+            old = 1.0 if r.factor is None or pd.isna(r.factor) else float(r.factor)
+            if m != old:
+                scaled += conn.execute(text(_SCALE_SQL),
+                                       {"aid": asset_id, "res": RES, "ex": r.ex_date, "delta": m / old}).rowcount
+            conn.execute(text(_MARK_SQL), {"aid": asset_id, "ex": r.ex_date, "kind": r.kind, "factor": m})
+    return {"mode": "incremental", "actions": len(pending) - deferred, "deferred": deferred,
+            "filled": int(filled), "scaled": int(scaled)}
+
+def rebuild_adjustments(engine, asset_id: int, chunk: int = 5000) -> Dict[str, Any]:
+    """원시 바 + 전체 행위로 계수를 처음부터 다시 계산해 기록(원본 수정/검증용)."""
+    with engine.begin() as conn:
+        bars = conn.execute(text(f"""
+            SELECT ts, close FROM `{DB_NAME}`.equity_bars WHERE asset_id=:aid AND res=:res ORDER BY ts
+        """), {"aid": asset_id, "res": RES}).fetchall()
+    acts = load_corp_actions(engine, asset_id)
+    ts = [r[0] for r in bars]
+    close = np.array([np.nan if r[1] is None else r[1] for r in bars], dtype=np.float64)
+    m = action_multipliers(acts["kind"], acts["ratio"], acts["amount"],
+                           prev_close(ts, close, acts["ex_date"])) if len(acts) else np.empty(0)
+    fac = adjustment_factors(ts, acts["ex_date"], m) if len(bars) else np.empty(0)
+    adj = close * fac
+    recs = [{"aid": asset_id, "res": RES, "ts": t, "f": float(f), "ac": None if np.isnan(a) else float(a)}
+            for t, f, a in zip(ts, fac, adj)]
+    with engine.begin() as conn:
+        q = text(f"""
+            UPDATE `{DB_NAME}`.equity_bars SET adj_factor=:f, adj_close=:ac
+            WHERE asset_id=:aid AND res=:res AND ts=:ts
+        """)
+        for i in range(0, len(recs), chunk):
+            conn.execute(q, recs[i: i + chunk])
+        for r, f in zip(acts.itertuples(index=False), m):
+            conn.execute(text(_MARK_SQL), {"aid": asset_id, "ex": r.ex_date, "kind": r.kind, "factor": float(f)})
+    return {"mode": "rebuild", "actions": len(acts), "bars": len(recs)}
+
+def adjusted_frame(df: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """메모리상의 원시 바 + 행위 → 조정 OHLC(검증/DB 없는 경로용). 거래량은 원시."""
+    if actions.empty or df.empty:
+        return df.copy()
+    m = action_multipliers(actions["kind"], actions["ratio"], actions["amount"],
+                           prev_close(df.index, df["close"], actions["ex_date"]))
+    fac = adjustment_factors(df.index, actions["ex_date"], m)
+    out = df.copy()
+    for c in ("open", "high", "low", "close"):
+        out[c] = df[c].to_numpy(dtype=np.float64) * fac
+    return out
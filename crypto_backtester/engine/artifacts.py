@@ -0,0 +1,172 @@
+from __future__ import annotations
+import os, json, tempfile, zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# 단일 파일 컬럼형 산출물(.npz, 멤버별 deflate 압축)
+#   run 단위:        <run_dir>/run.npz
+#     equity/ts, equity/value, orders/<col>..., summary(JSON 문자열)
+#   experiment 단위: <exp_dir>/runs.npz
+#     <run_id>/equity/ts, <run_id>/orders/<col>, <run_id>/summary, __index__(요약 목록 JSON)
+# np.load는 zip 멤버를 요청 시점에만 읽으므로 필요한 열/런만 디코딩된다.
+RUN_FILE = "run.npz"
+EXP_FILE = "runs.npz"
+ARTIFACT_FORMATS = ("csv", "npz")
+
+# --------- 인코딩 ---------
+def _ts_ns(values) -> np.ndarray:
+    idx = pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    return idx.as_unit("ns").asi8
+
+def _encode_run(equity: pd.Series, orders, summary: Dict[str, Any], prefix: str = "") -> Dict[str, np.ndarray]:
+    out = {
+        f"{prefix}equity/ts": _ts_ns(equity.index),
+        f"{prefix}equity/value": equity.to_numpy(dtype=np.float64),
+        f"{prefix}summary": np.array(json.dumps(summary, ensure_ascii=False, default=str)),
+    }
+    odf = orders if isinstance(orders, pd.DataFrame) else pd.DataFrame(list(orders))
+    for col in odf.columns:
+        s = odf[col]
+        if col == "ts":
+            arr = _ts_ns(s)
+        elif pd.api.types.is_numeric_dtype(s):
+            arr = s.to_numpy(dtype=np.float64)
+        else:
+            arr = s.astype(str).to_numpy(dtype=str)         # 유니코드 배열(pickle 불필요)
+        out[f"{prefix}orders/{col}"] = arr
+    return out
+
+def _atomic_savez(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".npz.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, path)
+
+def _write_members(zf: zipfile.ZipFile, arrays: Dict[str, np.ndarray]) -> None:
+    """배열을 .npz 멤버(<name>.npy)로 하나씩 압축 기록 — np.load로 그대로 읽힌다."""
+    for name, arr in arrays.items():
+        with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.asanyarray(arr), allow_pickle=False)
+
+# --------- run 단위 ---------
+def write_run_artifact(run_dir: str | Path, equity: pd.Series, orders, summary: Dict[str, Any]) -> str:
+    """equity/orders/summary를 <run_dir>/run.npz 하나로 저장. 경로 반환."""
+    fp = Path(run_dir) / RUN_FILE
+    _atomic_savez(fp, _encode_run(equity, orders, summary))
+    return str(fp)
+
+def _decode_equity(z, prefix: str = "") -> pd.Series:
+    idx = pd.to_datetime(z[f"{prefix}equity/ts"], utc=True)
+    return pd.Series(z[f"{prefix}equity/value"], index=idx, name="equity")
+
+def _decode_orders(z, prefix: str = "", columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    head = f"{prefix}orders/"
+    avail = [k[len(head):] for k in z.files if k.startswith(head)]
+    cols = [c for c in (columns or avail) if c in avail]
+    data = {}
+    for c in cols:
+        arr = z[head + c]
+        data[c] = pd.to_datetime(arr).tz_localize(None) if c == "ts" else arr
+    return pd.DataFrame(data, columns=cols)
+
+def read_summary(path: str | Path) -> Dict[str, Any]:
+    with np.load(path) as z:
+        return json.loads(str(z["summary"]))
+
+def read_equity(path: str | Path) -> pd.Series:
+    with np.load(path) as z:
+        return _decode_equity(z)
+
+def read_orders(path: str | Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """columns 지정 시 해당 열 멤버만 읽는다."""
+    with np.load(path) as z:
+        return _decode_orders(z, columns=columns)
+
+def load_run_dir(run_dir: str | Path) -> Dict[str, Any]:
+    """run 폴더(csv 또는 npz 포맷)에서 summary/equity/orders를 읽는다."""
+    d = Path(run_dir)
+    if (d / RUN_FILE).exists():
+        with np.load(d / RUN_FILE) as z:
+            return {"summary": json.loads(str(z["summary"])),
+                    "equity": _decode_equity(z), "orders": _decode_orders(z)}
+    summary = json.loads((d / "summary.json").read_text(encoding="utf-8"))
+    equity = pd.Series([], index=pd.DatetimeIndex([], tz="UTC"), dtype=np.float64, name="equity")
+    if (d / "equity.csv").exists():
+        eq = pd.read_csv(d / "equity.csv", index_col=0)
+        equity = pd.Series(eq.iloc[:, 0].to_numpy(dtype=np.float64),
+                           index=pd.to_datetime(eq.index, utc=True), name="equity")
+    orders_fp = d / "orders.csv"
+    try:
+        orders = pd.read_csv(orders_fp) if orders_fp.exists() else pd.DataFrame()
+    except pd.errors.EmptyDataError:                 # 거래 없는 run: 헤더도 없는 빈 CSV
+        orders = pd.DataFrame()
+    return {"summary": summary, "equity": equity, "orders": orders}
+
+# --------- experiment 단위(run_id 접두) ---------
+def pack_experiment(exp_dir: str | Path, out: str | Path | None = None,
+                    run_ids: Optional[Iterable[str]] = None) -> str:
+    """
+    <exp_dir>/runs/* 를 하나의 runs.npz로 묶는다(원본 폴더는 그대로 둔다).
+    run을 하나씩 읽어 zip 멤버로 바로 흘려 쓰므로 메모리는 run 1개 분량만 쓴다(수천 run sweep 대응).
+    """
+    exp = Path(exp_dir)
+    runs_root = exp / "runs"
+    wanted = set(run_ids) if run_ids is not None else None
+    index: List[Dict[str, Any]] = []
+    fp = Path(out) if out else exp / EXP_FILE
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=fp.parent, suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for d in sorted(p for p in runs_root.iterdir() if p.is_dir()):
+                if wanted is not None and d.name not in wanted:
+                    continue
+                if not ((d / RUN_FILE).exists() or (d / "summary.json").exists()):
+                    continue
+                run = load_run_dir(d)
+                rid = run["summary"].get("run_id", d.name)
+                _write_members(zf, _encode_run(run["equity"], run["orders"], run["summary"], prefix=f"{rid}/"))
+                index.append(run["summary"])
+                del run
+            _write_members(zf, {"__index__": np.array(json.dumps(index, ensure_ascii=False, default=str))})
+        os.replace(tmp, fp)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return str(fp)
+
+def read_index(path: str | Path) -> pd.DataFrame:
+    """experiment 파일의 run 요약 표(runs.csv 대응). 에쿼티/주문 멤버는 읽지 않는다."""
+    with np.load(path) as z:
+        return pd.DataFrame(json.loads(str(z["__index__"])))
+
+def read_runs(path: str | Path, run_ids: Optional[Sequence[str]] = None,
+              parts: Sequence[str] = ("summary", "equity"),
+              order_columns: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    experiment 파일에서 요청한 run/파트만 읽는다.
+    parts: "summary" / "equity" / "orders" 조합, order_columns: 주문 열 선택.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    with np.load(path) as z:
+        if run_ids is None:
+            run_ids = [s["run_id"] for s in json.loads(str(z["__index__"]))]
+        for rid in run_ids:
+            p = f"{rid}/"
+            if f"{p}summary" not in z.files:
+                raise KeyError(f"run not in {path}: {rid}")
+            rec: Dict[str, Any] = {}
+            if "summary" in parts:
+                rec["summary"] = json.loads(str(z[f"{p}summary"]))
+            if "equity" in parts:
+                rec["equity"] = _decode_equity(z, p)
+            if "orders" in parts:
+                rec["orders"] = _decode_orders(z, p, order_columns)
+            out[rid] = rec
+    return out
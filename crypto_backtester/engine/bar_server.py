@@ -0,0 +1,318 @@
+from __future__ import annotations
+import os, json, mmap, socket, socketserver, threading, time
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import ROOT, BAR_COLUMNS, load_conf
+
+# 로컬 hot 바 서버
+#   - (asset_id, res, market) 시리즈 전체를 한 번 읽어 이름 있는 공유메모리에 올린다
+#     레이아웃: ts int64[n] (UTC ns) | open | high | low | close | volume  (각 float64[n], 열 연속)
+#   - 제어 소켓(Unix, 줄 단위 JSON): {"op": "get"|"stats"|"evict"|"ping", ...}
+#   - 클라이언트는 세그먼트를 mmap으로 붙여 [start, end)를 searchsorted로 잘라 복사 없이 DataFrame을 만든다
+#   - budget_mb 초과 시 가장 오래 안 쓴 시리즈부터 unlink (이미 붙은 클라이언트 매핑은 유지됨)
+ENV_SOCKET = "ES_BAR_SOCKET"
+DEFAULTS: Dict[str, Any] = {"enabled": True, "socket": ".cache/bar_server.sock", "budget_mb": 2048, "ttl_sec": 600}
+SHM_DIR = Path("/dev/shm")
+_CONNECT_TIMEOUT = 0.5
+_REQUEST_TIMEOUT = 120.0      # 첫 요청은 서버가 DB에서 읽는 시간 포함
+
+Key = Tuple[int, str, str]
+Loader = Callable[[int, str, str], pd.DataFrame]
+
+def server_conf(conf: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    c = dict(DEFAULTS)
+    c.update(((conf if conf is not None else load_conf()).get("bar_server") or {}))
+    return c
+
+def socket_path(conf: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """환경변수 ES_BAR_SOCKET 우선, 없으면 설정(bar_server.socket, crypto_backtester/ 기준 상대경로)."""
+    env = os.getenv(ENV_SOCKET)
+    if env:
+        return env
+    c = server_conf(conf)
+    if not c.get("enabled", False):
+        return None
+    p = Path(c["socket"])
+    return str(p if p.is_absolute() else Path(ROOT) / p)
+
+def _segment_bytes(n: int) -> int:
+    return 8 * n * (1 + len(BAR_COLUMNS))
+
+# --------- 서버 ---------
+class _Segment:
+    def __init__(self, key: Key, df: pd.DataFrame):
+        n = len(df)
+        self.key, self.rows, self.nbytes = key, n, _segment_bytes(n)
+        self.shm = SharedMemory(create=True, size=max(self.nbytes, 1))
+        ts = np.ndarray((n,), dtype=np.int64, buffer=self.shm.buf)
+        vals = np.ndarray((len(BAR_COLUMNS), n), dtype=np.float64, buffer=self.shm.buf, offset=8 * n)
+        ts[:] = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+        for i, c in enumerate(BAR_COLUMNS):
+            vals[i] = df[c].to_numpy(dtype=np.float64)
+        del ts, vals                                    # buf 참조 해제(close 가능하도록)
+        self.loaded_at = time.time()
+
+    def info(self) -> Dict[str, Any]:
+        return {"name": self.shm.name, "rows": self.rows, "nbytes": self.nbytes, "loaded_at": self.loaded_at}
+
+    def release(self) -> None:
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class _Loading:
+    """키별 진행 중 적재: 같은 키의 후속 요청은 done을 기다려 결과를 공유한다."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.stale = False                              # 적재 중 evict(무효화)됨 → 결과를 캐시하지 않고 다시 적재
+        self.error: Optional[Dict[str, Any]] = None
+
+class BarServer:
+    """
+    loader(asset_id, res, market) -> 전체 바 DataFrame 으로 시리즈를 채운다(기본: DB).
+    요청 처리는 스레드별. 잠금은 캐시 조회/삽입/축출에만 잡고 DB 적재는 잠금 밖에서 하므로
+    느린 cold 적재가 다른 시리즈의 cache hit를 막지 않는다. 같은 키의 동시 miss는 적재 1회만 한다.
+    """
+
+    def __init__(self, sock: str, budget_mb: float = DEFAULTS["budget_mb"], ttl_sec: float = DEFAULTS["ttl_sec"],
+                 loader: Optional[Loader] = None):
+        self.sock = sock
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.ttl = float(ttl_sec)
+        self.loader = loader or _db_loader()
+        self.cache: "OrderedDict[Key, _Segment]" = OrderedDict()
+        self.loading: Dict[Key, _Loading] = {}
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        self.closed = False
+        self._srv: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    # ---- 캐시 ----
+    def _used(self) -> int:
+        return sum(s.nbytes for s in self.cache.values())
+
+    def _drop(self, key: Key) -> None:
+        seg = self.cache.pop(key, None)
+        if seg is not None:
+            seg.release()
+            self.evictions += 1
+
+    def get(self, key: Key) -> Dict[str, Any]:
+        while True:
+            with self.lock:
+                seg = self.cache.get(key)
+                if seg is not None and time.time() - seg.loaded_at <= self.ttl:
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return {"ok": True, **seg.info()}
+                job = self.loading.get(key)
+                if job is None:
+                    self.misses += 1
+                    if seg is not None:                 # TTL 만료: 새 데이터로 다시 적재
+                        self._drop(key)
+                    job = self.loading[key] = _Loading()
+                    break
+            job.done.wait()                             # 다른 요청이 적재 중 → 끝나면 캐시에서 다시 조회
+            if job.error is not None:
+                return job.error
+        try:
+            return self._load(key, job)
+        finally:
+            with self.lock:
+                self.loading.pop(key, None)
+            job.done.set()
+
+    def _load(self, key: Key, job: _Loading) -> Dict[str, Any]:
+        while True:
+            try:
+                df = self.loader(*key)                  # 잠금 밖(DB 읽기)
+            except Exception as e:
+                job.error = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                return job.error
+            need = _segment_bytes(len(df))
+            if need > self.budget:
+                job.error = {"ok": False, "error": f"series too large for budget ({need} > {self.budget} bytes)"}
+                return job.error
+            seg = _Segment(key, df)
+            del df
+            with self.lock:
+                if self.closed:                         # 종료 중: 캐시에 넣으면 세그먼트가 남는다
+                    seg.release()
+                    job.error = {"ok": False, "error": "server stopped"}
+                    return job.error
+                if job.stale:                           # 적재 도중 무효화(업서트) → 이 결과는 이미 낡았을 수 있음
+                    job.stale = False
+                else:
+                    while self.cache and self._used() + need > self.budget:
+                        self._drop(next(iter(self.cache)))  # LRU
+                    self.cache[key] = seg
+                    return {"ok": True, **seg.info()}
+            seg.release()
+
+    def evict(self, key: Optional[Key] = None) -> int:
+        with self.lock:
+            for k, job in self.loading.items():
+                if key is None or k == key:
+                    job.stale = True
+            keys = [key] if key is not None else list(self.cache)
+            n = sum(1 for k in keys if k in self.cache)
+            for k in keys:
+                self._drop(k)
+            return n
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "series": [{"asset_id": k[0], "res": k[1], "market": k[2], **s.info()} for k, s in self.cache.items()],
+                "used_bytes": self._used(), "budget_bytes": self.budget,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            }
+
+    # ---- 소켓 ----
+    def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op")
+        try:
+            if op == "ping":
+                return {"ok": True}
+            if op == "get":
+                return self.get((int(req["asset_id"]), str(req["res"]), str(req.get("market", "crypto"))))
+            if op == "stats":
+                return {"ok": True, **self.stats()}
+            if op == "evict":
+                key = None
+                if req.get("asset_id") is not None:
+                    key = (int(req["asset_id"]), str(req["res"]), str(req.get("market", "crypto")))
+                return {"ok": True, "evicted": self.evict(key)}
+            return {"ok": False, "error": f"unknown op={op}"}
+        except Exception as e:                          # 로더(DB) 오류 등은 클라이언트가 폴백하도록 전달
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def serve_forever(self) -> None:
+        server = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        resp = server.handle(json.loads(line))
+                    except ValueError:
+                        resp = {"ok": False, "error": "bad request"}
+                    self.wfile.write((json.dumps(resp) + "\n").encode("utf-8"))
+
+        Path(self.sock).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(self.sock):
+            if _request(self.sock, {"op": "ping"}) is not None:
+                raise RuntimeError(f"bar server already running on {self.sock}")
+            os.unlink(self.sock)                        # 비정상 종료로 남은 소켓 파일
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        self._srv = socketserver.ThreadingUnixStreamServer(self.sock, _Handler)
+        try:
+            self._srv.serve_forever()
+        finally:
+            self._srv.server_close()
+            with self.lock:
+                self.closed = True
+            self.evict()
+            try:
+                os.unlink(self.sock)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self) -> None:
+        if self._srv is not None:
+            self._srv.shutdown()
+
+def _db_loader() -> Loader:
+    from crypto_backtester.engine.db_utils import get_engine, _fetch_bars_db
+    engine = get_engine()
+
+    def load(asset_id: int, res: str, market: str) -> pd.DataFrame:
+        return _fetch_bars_db(engine, asset_id, res, "1970-01-01", "2100-01-01", market=market)
+    return load
+
+# --------- 클라이언트 ---------
+def _request(sock: str, req: Dict[str, Any], timeout: float = _REQUEST_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """서버가 없거나 응답이 없으면 None."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(_CONNECT_TIMEOUT)
+            s.connect(sock)
+            s.settimeout(timeout)
+            s.sendall((json.dumps(req) + "\n").encode("utf-8"))
+            buf = b""
+            while not buf.endswith(b"\n"):
+                chunk = s.recv(65536)
+                if not chunk:
+                    return None
+                buf += chunk
+        return json.loads(buf)
+    except (OSError, ValueError):
+        return None
+
+def _attach(name: str, nbytes: int):
+    """
+    세그먼트를 읽기 전용 데이터 + 페이지 단위 copy-on-write로 매핑한다(ACCESS_COPY: 쓰면 내 프로세스 사본만 바뀜).
+    매핑 수명은 이를 참조하는 배열이 결정하므로 close/unlink를 신경 쓸 필요가 없다.
+    /dev/shm이 없는 플랫폼은 SharedMemory로 붙어 복사(resource_tracker가 서버 세그먼트를 지우지 않도록 해제).
+    """
+    fp = SHM_DIR / name.lstrip("/")
+    if fp.exists():
+        with open(fp, "rb") as f:
+            return mmap.mmap(f.fileno(), nbytes, access=mmap.ACCESS_COPY)
+    shm = SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return bytearray(shm.buf[:nbytes])
+    finally:
+        shm.close()
+
+def _utc_ns(t) -> int:
+    ts = pd.Timestamp(t)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return ts.as_unit("ns").value
+
+def fetch_from_server(asset_id: int, res: str, start: str, end: str, market: str = "crypto",
+                      sock: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """서버에서 [start, end) 바를 복사 없이 가져온다. 서버가 없거나 실패하면 None(호출자가 DB로 폴백)."""
+    sock = sock or socket_path()
+    if not sock or not os.path.exists(sock):
+        return None
+    resp = _request(sock, {"op": "get", "asset_id": int(asset_id), "res": res, "market": market})
+    if not resp or not resp.get("ok"):
+        return None
+    n = int(resp["rows"])
+    if n == 0:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    try:
+        buf = _attach(resp["name"], int(resp["nbytes"]))
+    except (FileNotFoundError, OSError, ValueError):
+        return None                                     # 응답 직후 축출됨 → DB 폴백
+    ts = np.frombuffer(buf, dtype=np.int64, count=n)
+    vals = np.frombuffer(buf, dtype=np.float64, count=len(BAR_COLUMNS) * n, offset=8 * n).reshape(len(BAR_COLUMNS), n)
+    lo, hi = np.searchsorted(ts, [_utc_ns(start), _utc_ns(end)], side="left")
+    if hi <= lo:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    idx = pd.DatetimeIndex(ts[lo:hi].view("datetime64[ns]"), name="ts").tz_localize("UTC")
+    return pd.DataFrame({c: vals[i, lo:hi] for i, c in enumerate(BAR_COLUMNS)}, index=idx, copy=False)
+
+def server_request(op: str, sock: Optional[str] = None, **kw) -> Optional[Dict[str, Any]]:
+    sock = sock or socket_path()
+    return _request(sock, {"op": op, **kw}) if sock else None
+
+def invalidate(asset_id: int, res: str, market: str = "crypto", sock: Optional[str] = None) -> bool:
+    """업서트 후 서버의 해당 시리즈를 버리게 한다(best-effort: 서버가 없거나 응답이 없으면 False)."""
+    sock = sock or socket_path()
+    if not sock or not os.path.exists(sock):
+        return False
+    resp = _request(sock, {"op": "evict", "asset_id": int(asset_id), "res": res, "market": market},
+                    timeout=_CONNECT_TIMEOUT)
+    return bool(resp and resp.get("ok"))
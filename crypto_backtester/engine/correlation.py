@@ -0,0 +1,256 @@
+from __future__ import annotations
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import ensure_asset, fetch_bars
+
+# --------- 데이터 로드 ---------
+def _close_series(df: pd.DataFrame, resample: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    바 → (행 라벨 ts, 유효 close의 라벨 ts, close float64), ts는 int64 ns.
+    NaN close는 값에서만 빠지고(직전 가격 유지) 행은 남는다. resample이면 right-close 라벨별 마지막 유효 값.
+    """
+    idx = pd.DatetimeIndex(df.index)
+    close = df["close"].to_numpy(dtype=np.float64)
+    order = np.argsort(idx.asi8, kind="stable")
+    idx, close = idx[order], close[order]
+    if resample and len(idx):
+        idx = idx.ceil(resample)                        # (label - freq, label] → label
+    rows = idx.as_unit("ns").asi8
+    ok = ~np.isnan(close)
+    ts, close = rows[ok], close[ok]
+    if resample and len(ts):
+        last = np.r_[ts[1:] != ts[:-1], True]
+        ts, close = ts[last], close[last]
+    return rows, ts, close
+
+def load_returns(engine, assets: Sequence[Tuple[str, str]], res: str, start: str, end: str,
+                 resample: Optional[str] = None, dtype=np.float64) -> pd.DataFrame:
+    """
+    (market, symbol) 목록의 close를 바 테이블에서 읽어 정렬된 로그수익률 행렬(T×N)로 만든다.
+    - resample: '5min'/'15min' 등 준실시간 갱신용 리샘플(right-close, last)
+    - 결측 바는 직전 가격 유지(= 수익률 0)로 취급, 상장 이전 구간도 0
+    - 결과 행렬은 처음부터 dtype으로 한 번만 할당하고 자산(열)별로 채운다(열 단위 계산만 float64).
+      최대 메모리 ≈ 결과(T×N×dtype) + 원시 close(T×N float64) — T×N float64 중간 복사본을 만들지 않는다.
+    """
+    series, tz, name = [], "UTC", None
+    labels = np.empty(0, dtype=np.int64)
+    shared = labels
+    for market, symbol in assets:
+        aid = ensure_asset(engine, symbol, market=market)
+        df = fetch_bars(engine, aid, res, start, end, market=market)
+        if isinstance(df.index, pd.DatetimeIndex):
+            tz, name = df.index.tz, df.index.name
+        rows, ts, close = _close_series(df, resample)
+        del df
+        if not np.array_equal(rows, labels):            # 합집합 인덱스는 증분으로 하나만 유지
+            labels = np.union1d(labels, rows)
+        if np.array_equal(ts, shared):                  # 같은 시각 배열은 자산 간 공유(보통 대부분 같다)
+            ts = shared
+        shared = ts
+        series.append((symbol, ts, close))
+    if resample and len(labels):
+        grid = pd.date_range(pd.Timestamp(labels[0]), pd.Timestamp(labels[-1]), freq=resample)
+        labels = grid.as_unit("ns").asi8
+
+    T = len(labels)
+    out = np.empty((T, len(series)), dtype=dtype, order="F")   # 열 연속 → 자산별 채우기가 연속 쓰기
+    for j in range(len(series)):
+        symbol, ts, close = series[j]
+        series[j] = (symbol, None, None)                # 채운 자산의 원본은 바로 놓는다
+        last = np.full(T, -1, dtype=np.int64)
+        last[np.searchsorted(labels, ts)] = np.arange(len(ts))
+        np.maximum.accumulate(last, out=last)           # ffill: 각 시점의 직전 관측 위치
+        lp = np.log(close)[last]
+        lp[last < 0] = np.nan                           # 상장 이전
+        col = out[:, j]
+        if T:
+            col[0] = 0.0
+            col[1:] = np.nan_to_num(np.diff(lp), nan=0.0)
+    idx = pd.DatetimeIndex(labels.view("datetime64[ns]"), name=name)
+    idx = idx.tz_localize("UTC").tz_convert(tz) if tz is not None else idx
+    return pd.DataFrame(out, index=idx, columns=[s[0] for s in series], copy=False)
+
+# --------- 내부 유틸 ---------
+def _corr_from_moments(s1: np.ndarray, s2: np.ndarray, n: int) -> np.ndarray:
+    """합(s1)·곱합(s2)·표본수(n)에서 상관행렬. 분산 0인 자산의 행/열은 NaN."""
+    if n < 2:
+        return np.full(s2.shape, np.nan)
+    mean = s1 / n
+    cov = (s2 - n * np.outer(mean, mean)) / (n - 1)
+    sd = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(sd, sd)
+    dead = sd <= 0
+    corr[dead, :] = np.nan
+    corr[:, dead] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    idx = np.flatnonzero(~dead)
+    corr[idx, idx] = 1.0
+    return corr
+
+def _as_matrix(returns) -> Tuple[np.ndarray, Optional[pd.Index], Optional[pd.Index]]:
+    if isinstance(returns, pd.DataFrame):
+        return returns.to_numpy(), returns.index, returns.columns
+    return np.asarray(returns), None, None
+
+# --------- 증분(스트리밍) 엔진 ---------
+class RollingCorrelation:
+    """
+    N개 자산의 롤링 상관행렬을 바 1개당 O(N²)으로 갱신한다.
+    윈도 크기의 링버퍼와 합/곱합(co-moment)만 유지하므로 윈도 재계산이 필요 없다.
+    부동소수 누적오차는 resync_every 바마다 버퍼에서 다시 합산해 정리한다.
+    """
+
+    def __init__(self, n_assets: int, window: int, resync_every: Optional[int] = None):
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.n_assets = n_assets
+        self.window = window
+        self.resync_every = resync_every if resync_every is not None else 50 * window
+        self._buf = np.zeros((window, n_assets), dtype=np.float64)
+        self._s1 = np.zeros(n_assets, dtype=np.float64)
+        self._s2 = np.zeros((n_assets, n_assets), dtype=np.float64)
+        self._tmp = np.empty((n_assets, n_assets), dtype=np.float64)
+        self._pos = 0
+        self._count = 0
+        self._updates = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def update(self, x) -> None:
+        """새 바의 수익률 벡터(N,)를 반영. NaN은 0으로 취급."""
+        x = np.nan_to_num(np.asarray(x, dtype=np.float64), nan=0.0)
+        if x.shape != (self.n_assets,):
+            raise ValueError(f"expected shape ({self.n_assets},), got {x.shape}")
+        if self._count == self.window:
+            old = self._buf[self._pos]
+            self._s1 -= old
+            np.multiply(old[:, None], old[None, :], out=self._tmp)
+            self._s2 -= self._tmp
+        else:
+            self._count += 1
+        self._buf[self._pos] = x
+        self._s1 += x
+        np.multiply(x[:, None], x[None, :], out=self._tmp)
+        self._s2 += self._tmp
+        self._pos = (self._pos + 1) % self.window
+        self._updates += 1
+        if self.resync_every and self._updates % self.resync_every == 0:
+            self.resync()
+
+    def update_many(self, rows) -> None:
+        for x in np.asarray(rows, dtype=np.float64):
+            self.update(x)
+
+    def resync(self) -> None:
+        """버퍼에서 합/곱합을 다시 계산(누적오차 정리)."""
+        live = self._buf if self._count == self.window else self._buf[: self._count]
+        self._s1 = live.sum(axis=0)
+        self._s2 = live.T @ live
+
+    def cov(self) -> np.ndarray:
+        n = self._count
+        if n < 2:
+            return np.full((self.n_assets, self.n_assets), np.nan)
+        mean = self._s1 / n
+        return (self._s2 - n * np.outer(mean, mean)) / (n - 1)
+
+    def corr(self) -> np.ndarray:
+        return _corr_from_moments(self._s1, self._s2, self._count)
+
+# --------- 배치(히스토리) 모드 ---------
+CHUNK_BYTES = 64 * 1024 * 1024      # iter_rolling_corr 청크 1개의 (k, N, N) float64 상한
+
+def iter_rolling_corr(returns, window: int, step: int = 1,
+                      chunk_points: Optional[int] = None) -> Iterator[Tuple[pd.Index, np.ndarray]]:
+    """
+    히스토리 전체의 롤링 상관을 블록 행렬곱으로 계산해 청크 단위로 내보낸다(제너레이터).
+    - step 바마다 한 번씩(예: 5m에서 step=288 → 일 단위) 윈도 끝 시점의 상관행렬을 낸다
+    - 청크: (윈도 끝 시점 인덱스, (k, N, N) 배열), k <= chunk_points (기본: CHUNK_BYTES 기준)
+    - 상태는 N×N 합/곱합뿐이고 결과는 청크마다 흘려보내므로 메모리는 K(출력 시점 수)와 무관하다
+    """
+    X, index, _ = _as_matrix(returns)
+    T, N = X.shape
+    if window < 2:
+        raise ValueError("window must be >= 2")
+    if step < 1:
+        raise ValueError("step must be >= 1")
+    ends = np.arange(window - 1, T, step)
+    index = index if index is not None else pd.RangeIndex(T)
+    chunk = chunk_points or max(1, CHUNK_BYTES // (8 * N * N))
+    # step이 작으면 블록 증감, 주기적으로(≈윈도 1개분) 직접 재합산
+    resync = max(1, window // step)
+    s1 = s2 = None
+    prev = -1
+    for c0 in range(0, len(ends), chunk):
+        part = ends[c0: c0 + chunk]
+        out = np.empty((len(part), N, N), dtype=np.float64)
+        for j, e in enumerate(part):
+            k = c0 + j
+            if s1 is None or k % resync == 0 or step >= window:
+                blk = np.nan_to_num(X[e - window + 1: e + 1].astype(np.float64), nan=0.0)
+                s1 = blk.sum(axis=0)
+                s2 = blk.T @ blk
+            else:
+                add = np.nan_to_num(X[prev + 1: e + 1].astype(np.float64), nan=0.0)
+                sub = np.nan_to_num(X[prev + 1 - window: e + 1 - window].astype(np.float64), nan=0.0)
+                s1 += add.sum(axis=0) - sub.sum(axis=0)
+                s2 += add.T @ add - sub.T @ sub
+            out[j] = _corr_from_moments(s1, s2, window)
+            prev = e
+        yield index[part], out
+
+def rolling_corr(returns, window: int, step: int = 1) -> Tuple[pd.Index, np.ndarray]:
+    """
+    iter_rolling_corr 결과를 한 번에 모은다: (윈도 끝 시점 인덱스, (K, N, N) 배열).
+    K×N×N 전체를 메모리에 올리므로 자산이 적거나 step이 클 때(분석/테스트)만 쓴다.
+    """
+    X, index, _ = _as_matrix(returns)
+    parts = list(iter_rolling_corr(X, window, step=step))
+    ends = np.arange(window - 1, X.shape[0], step)
+    idx = index[ends] if index is not None else pd.RangeIndex(X.shape[0])[ends]
+    mats = np.concatenate([m for _, m in parts]) if parts else np.empty((0, X.shape[1], X.shape[1]))
+    return idx, mats
+
+# --------- 레짐(고/저 변동성) 분해 ---------
+def volatility_regime(returns: pd.DataFrame, window: int, quantile: float = 0.5) -> pd.Series:
+    """
+    자산별 롤링 변동성의 횡단면 평균이 표본 분위수(quantile)를 넘으면 'high', 아니면 'low'.
+    warmup 구간은 NaN. (표본 전체 분위수를 쓰므로 연구용 — 실시간 판정에는 expanding 기준 권장)
+    """
+    vol = returns.rolling(window, min_periods=window).std().mean(axis=1)
+    thr = vol.quantile(quantile)
+    labels = pd.Series(np.where(vol > thr, "high", "low"), index=returns.index, dtype=object)
+    labels[vol.isna()] = np.nan
+    return labels.rename("regime")
+
+def corr_by_regime(returns: pd.DataFrame, labels: pd.Series) -> Dict[str, pd.DataFrame]:
+    """레짐 레이블별로 해당 바들만 모아 상관행렬을 계산한다(레이블당 1회 행렬곱)."""
+    X = np.nan_to_num(returns.to_numpy(dtype=np.float64), nan=0.0)
+    lab = labels.reindex(returns.index)
+    out: Dict[str, pd.DataFrame] = {}
+    for name in pd.unique(lab.dropna()):
+        sub = X[(lab == name).to_numpy()]
+        corr = _corr_from_moments(sub.sum(axis=0), sub.T @ sub, len(sub))
+        out[str(name)] = pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+    return out
+
+def corr_long(index: pd.Index, mats: np.ndarray, symbols: Sequence[str],
+              labels: Optional[pd.Series] = None) -> pd.DataFrame:
+    """(K,N,N) 결과를 상삼각 long 포맷(asof, a, b, corr, regime_label)으로 펼친다(correlation_cache 규격)."""
+    iu, ju = np.triu_indices(len(symbols), k=1)
+    K = len(index)
+    sym = np.asarray(symbols, dtype=object)
+    df = pd.DataFrame({
+        "asof": np.repeat(np.asarray(index), len(iu)),
+        "a": np.tile(sym[iu], K),
+        "b": np.tile(sym[ju], K),
+        "corr": mats[:, iu, ju].reshape(-1),
+    })
+    if labels is not None:
+        df["regime_label"] = np.repeat(labels.reindex(index).to_numpy(), len(iu))
+    return df
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, Sequence
+import numpy as np
+import pandas as pd
+
+import matplotlib
+matplotlib.use("Agg")  # 헤드리스 환경 렌더링
+import matplotlib.pyplot as plt
+
+# --------- 거래 목록(비용 무관) ---------
+def extract_trades(close: pd.Series, sig: pd.Series, liquidate_on_end: bool = True) -> Dict[str, Any]:
+    """
+    runner._simulate와 같은 규칙(on-close, long-only, all-in)으로 진입/청산 바를 1회 기록한다.
+    현재 엔진에서 거래 순서는 수수료/슬리피지와 무관하므로 이 결과를 모든 비용 조합에 재사용한다.
+    """
+    s = sig.reindex(close.index).fillna(0).astype(int).to_numpy()
+    prev = np.r_[0, s[:-1]]
+    entries = np.flatnonzero((prev == 0) & (s == 1))
+    exits = np.flatnonzero((prev == 1) & (s == 0))
+    T = len(s)
+    open_at_end = len(entries) > len(exits)
+    if open_at_end and liquidate_on_end:
+        exits = np.r_[exits, T - 1]
+    return {
+        "close": close.to_numpy(dtype=np.float64),
+        "index": close.index,
+        "in_pos": s == 1,
+        "entries": entries,
+        "exits": exits,                      # liquidate_on_end=False면 마지막 진입은 청산 없음
+        "liquidated": bool(open_at_end and liquidate_on_end),
+    }
+
+# --------- 비용 그리드 일괄 평가 ---------
+def _grid_metrics(eq: np.ndarray, ann: int) -> Dict[str, np.ndarray]:
+    """(T, G) 에쿼티 → runner._metrics와 같은 정의의 pnl/sharpe/mdd (G,)."""
+    G = eq.shape[1]
+    if eq.shape[0] < 2:
+        z = np.zeros(G)
+        return {"pnl": z, "sharpe": z.copy(), "mdd": z.copy()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = eq[1:] / eq[:-1] - 1.0
+        mu = ret.mean(axis=0)
+        sd = ret.std(axis=0, ddof=1)
+        sharpe = np.where(sd > 0, mu / sd * math.sqrt(ann), 0.0)
+        dd = eq / np.maximum.accumulate(eq, axis=0) - 1.0
+        pnl = eq[-1] / eq[0] - 1.0
+    return {"pnl": pnl, "sharpe": sharpe, "mdd": dd.min(axis=0)}
+
+def cost_surface(trades: Dict[str, Any], fee_bps: Sequence[float], slip_bps: Sequence[float],
+                 start_cash: float, periods_per_year: int, chunk: int = 32) -> Dict[str, Any]:
+    """
+    fee×slip 그리드 전체의 PnL/Sharpe/MDD를 NumPy 벡터 연산으로 계산한다.
+    거래 k의 자본 배수 g_k = r_k·(1-s)(1-f)/(1+s) - f (r_k = 청산가/진입가, 엔진의 수수료 차감 방식 그대로),
+    보유 중 바의 에쿼티 = 진입 자본 × (p_t / (p_entry·(1+s)) - f).
+    메모리는 (T × chunk)로 제한: 그리드를 chunk개 조합씩 나눠 처리.
+    """
+    fees = np.asarray(fee_bps, dtype=np.float64)
+    slips = np.asarray(slip_bps, dtype=np.float64)
+    F, S = np.meshgrid(fees / 10_000.0, slips / 10_000.0, indexing="ij")
+    f_all, s_all = F.ravel(), S.ravel()
+
+    close = trades["close"]
+    entries, exits = trades["entries"], trades["exits"]
+    T = len(close)
+    n_done = len(exits)
+    r = close[exits] / close[entries[:n_done]]                       # (K,)
+    # 바별: 완결 거래 수(자본 인덱스), 보유 여부, 현재 진입가
+    done_upto = np.zeros(T, dtype=np.int64)
+    np.add.at(done_upto, exits, 1)
+    done_upto = np.cumsum(done_upto)
+    in_pos = trades["in_pos"].copy()
+    if trades["liquidated"]:
+        in_pos[T - 1] = False                                         # 마지막 바는 청산 후 현금
+    entry_px = np.full(T, np.nan)
+    if len(entries):
+        seg = np.zeros(T, dtype=np.int64)
+        seg[entries] = 1
+        k_open = np.cumsum(seg) - 1                                   # 가장 최근 진입의 번호
+        has = k_open >= 0
+        entry_px[has] = close[entries[k_open[has]]]
+
+    out = {k: np.empty(len(f_all)) for k in ("pnl", "sharpe", "mdd")}
+    for lo in range(0, len(f_all), chunk):
+        f = f_all[lo: lo + chunk][None, :]
+        s = s_all[lo: lo + chunk][None, :]
+        g = r[:, None] * (1.0 - s) * (1.0 - f) / (1.0 + s) - f       # (K, g)
+        cap = start_cash * np.vstack([np.ones((1, f.shape[1])), np.cumprod(g, axis=0)])  # (K+1, g)
+        eq = cap[done_upto]                                           # (T, g)
+        pos = np.flatnonzero(in_pos)
+        if len(pos):
+            eq[pos] *= close[pos, None] / (entry_px[pos, None] * (1.0 + s)) - f
+        m = _grid_metrics(eq, periods_per_year)
+        for k in out:
+            out[k][lo: lo + chunk] = m[k]
+
+    shape = (len(fees), len(slips))
+    return {
+        "fee_bps": fees, "slip_bps": slips, "trades": int(n_done),
+        "pnl": out["pnl"].reshape(shape), "sharpe": out["sharpe"].reshape(shape), "mdd": out["mdd"].reshape(shape),
+    }
+
+def surface_frame(surface: Dict[str, Any]) -> pd.DataFrame:
+    """그리드 결과를 long 포맷(fee_bps, slip_bps, pnl, sharpe, mdd, trades)으로."""
+    F, S = np.meshgrid(surface["fee_bps"], surface["slip_bps"], indexing="ij")
+    return pd.DataFrame({
+        "fee_bps": F.ravel(), "slip_bps": S.ravel(),
+        "pnl": surface["pnl"].ravel(), "sharpe": surface["sharpe"].ravel(), "mdd": surface["mdd"].ravel(),
+        "trades": surface["trades"],
+    })
+
+def plot_cost_surface(surface: Dict[str, Any], path: str, base_fee: float | None = None,
+                      base_slip: float | None = None, title: str = "") -> None:
+    """PnL/Sharpe/MDD 히트맵(행=fee, 열=slip). 실행 비용 지점은 x로 표시."""
+    fees, slips = surface["fee_bps"], surface["slip_bps"]
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4.2))
+    for ax, key, cmap in zip(axes, ("pnl", "sharpe", "mdd"), ("RdYlGn", "RdYlGn", "RdYlGn")):
+        z = surface[key]
+        im = ax.imshow(z, origin="lower", aspect="auto", cmap=cmap)
+        ax.set_xticks(range(len(slips)), [f"{v:g}" for v in slips])
+        ax.set_yticks(range(len(fees)), [f"{v:g}" for v in fees])
+        ax.set_xlabel("slip_bps")
+        ax.set_ylabel("fee_bps")
+        ax.set_title(key)
+        if z.size <= 64:
+            for i in range(z.shape[0]):
+                for j in range(z.shape[1]):
+                    ax.text(j, i, f"{z[i, j]:.2f}", ha="center", va="center", fontsize=7)
+        if base_fee is not None and base_slip is not None:
+            fi = np.flatnonzero(np.isclose(fees, base_fee))
+            sj = np.flatnonzero(np.isclose(slips, base_slip))
+            if len(fi) and len(sj):
+                ax.plot(sj[0], fi[0], marker="x", color="black", markersize=10)
+        fig.colorbar(im, ax=ax, fraction=0.046)
+    fig.suptitle(title or f"Cost sensitivity (trades={surface['trades']})")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
@@ -2,6 +2,7 @@ from __future__ import annotations
 import os
 from typing import Optional, Iterable, Dict, Any
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 import yaml
 from dotenv import load_dotenv
@@ -80,14 +81,9 @@ def ensure_asset(engine, symbol: str, exchange: str | None = None,
         ).fetchone()
         return int(row[0])
 
-def upsert_bars(engine, asset_id: int, res: str, df: pd.DataFrame,
-                provider: str | None = None, market: str = "crypto") -> int:
-    table = resolve_bar_table(market)
-    if df.empty:
-        return 0
-    out = df.copy()
+def _bar_records(asset_id: int, res: str, df: pd.DataFrame) -> list:
     records = []
-    for ts, row in out.iterrows():
+    for ts, row in df.iterrows():
         # 각 row의 인덱스(ts)를 안전하게 UTC로 정규화
         ts = pd.Timestamp(ts)
         if ts.tz is None:
@@ -104,20 +100,197 @@ def upsert_bars(engine, asset_id: int, res: str, df: pd.DataFrame,
             "close": float(row["close"]),
             "volume": float(row["volume"]),
         })
-    sql = text(f"""
+    return records
+
+def _upsert_bars_sql(table: str):
+    # equity_bars: 재적재된 바는 adj_close를 비워 다음 adjust_equity_bars 실행 때 다시 채운다
+    adj = ", adj_close=NULL" if table == "equity_bars" else ""
+    return text(f"""
         INSERT INTO `{DB_NAME}`.{table}
           (asset_id, res, ts, open, high, low, close, volume)
         VALUES
           (:asset_id, :res, :ts, :open, :high, :low, :close, :volume)
         ON DUPLICATE KEY UPDATE
           open=VALUES(open), high=VALUES(high), low=VALUES(low),
-          close=VALUES(close), volume=VALUES(volume)
+          close=VALUES(close), volume=VALUES(volume){adj}
     """)
+
+def _default_chunk(kind: str) -> int:
+    # 청크 크기 기본값: conf resources 예산 기준(engine/resources.py)
+    from crypto_backtester.engine.resources import default_governor
+    gov = default_governor()
+    return gov.upsert_chunk_rows() if kind == "upsert" else gov.fetch_chunk_rows()
+
+def _upsert_chunked(conn, table: str, asset_id: int, res: str, df: pd.DataFrame, chunk_rows: int):
+    """레코드 dict를 chunk_rows행씩만 만들어 실행(같은 트랜잭션). (행 수, 최대 ts) 반환."""
+    n, last_ts = 0, None
+    for i in range(0, len(df), chunk_rows):
+        records = _bar_records(asset_id, res, df.iloc[i: i + chunk_rows])
+        conn.execute(_upsert_bars_sql(table), records)
+        n += len(records)
+        m = max(r["ts"] for r in records)
+        last_ts = m if last_ts is None else max(last_ts, m)
+    return n, last_ts
+
+def _invalidate_server(asset_id: int, res: str, market: str) -> None:
+    # 바가 바뀌었으니 로컬 바 서버의 해당 시리즈를 버린다(서버가 없으면 아무것도 안 함)
+    from crypto_backtester.engine.bar_server import invalidate
+    invalidate(asset_id, res, market=market)
+
+def upsert_bars(engine, asset_id: int, res: str, df: pd.DataFrame,
+                provider: str | None = None, market: str = "crypto",
+                chunk_rows: int | None = None) -> int:
+    table = resolve_bar_table(market)
+    if df.empty:
+        return 0
     with engine.begin() as conn:
-        conn.execute(sql, records)
-    return len(records)
+        n, _ = _upsert_chunked(conn, table, asset_id, res, df, chunk_rows or _default_chunk("upsert"))
+    _invalidate_server(asset_id, res, market)
+    return n
 
-def fetch_bars(engine, asset_id: int, res: str, start: str, end: str, market: str = "crypto") -> pd.DataFrame:
+# --------- ingest_status (워터마크) ---------
+def get_ingest_status(engine, asset_id: int, res: str) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        row = conn.execute(
+            text(f"""
+                SELECT last_ts, last_run_ts, status, msg
+                FROM `{DB_NAME}`.ingest_status WHERE asset_id=:aid AND res=:res
+            """),
+            {"aid": asset_id, "res": res}
+        ).fetchone()
+    if not row:
+        return None
+    return {"last_ts": row[0], "last_run_ts": row[1], "status": row[2], "msg": row[3]}
+
+def max_bar_ts(engine, asset_id: int, res: str, market: str = "crypto"):
+    """바 테이블에 적재된 마지막 ts(naive UTC). 없으면 None — 워터마크 없이 적재된 히스토리(range 모드) 감지용."""
+    table = resolve_bar_table(market)
+    with engine.begin() as conn:
+        row = conn.execute(
+            text(f"SELECT MAX(ts) FROM `{DB_NAME}`.{table} WHERE asset_id=:aid AND res=:res"),
+            {"aid": asset_id, "res": res}
+        ).fetchone()
+    return row[0] if row else None
+
+_STATUS_SQL = f"""
+    INSERT INTO `{DB_NAME}`.ingest_status (asset_id, res, last_ts, last_run_ts, status, msg)
+    VALUES (:aid, :res, :last_ts, UTC_TIMESTAMP(), :status, :msg)
+    ON DUPLICATE KEY UPDATE
+      last_ts=COALESCE(GREATEST(last_ts, VALUES(last_ts)), last_ts, VALUES(last_ts)),
+      last_run_ts=VALUES(last_run_ts), status=VALUES(status), msg=VALUES(msg)
+"""
+
+def upsert_bars_with_status(engine, asset_id: int, res: str, df: pd.DataFrame,
+                            market: str = "crypto", msg: str | None = None,
+                            chunk_rows: int | None = None) -> int:
+    """
+    바 업서트와 ingest_status 워터마크(last_ts)·status/msg 갱신을 한 트랜잭션으로 커밋한다.
+    워터마크는 뒤로 가지 않는다(GREATEST).
+    """
+    table = resolve_bar_table(market)
+    with engine.begin() as conn:
+        n, last_ts = 0, None
+        if not df.empty:
+            n, last_ts = _upsert_chunked(conn, table, asset_id, res, df, chunk_rows or _default_chunk("upsert"))
+        conn.execute(text(_STATUS_SQL), {
+            "aid": asset_id, "res": res, "last_ts": last_ts,
+            "status": "ok", "msg": (msg or "")[:255] or None,
+        })
+    if n:
+        _invalidate_server(asset_id, res, market)
+    return n
+
+def mark_ingest_status(engine, asset_id: int, res: str, status: str, msg: str | None = None) -> None:
+    """워터마크는 그대로 두고 status/msg/last_run_ts만 기록(에러 보고용)."""
+    with engine.begin() as conn:
+        conn.execute(text(_STATUS_SQL), {
+            "aid": asset_id, "res": res, "last_ts": None,
+            "status": status, "msg": (msg or "")[:255] or None,
+        })
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+FETCH_CHUNK_ROWS = 50_000
+
+def _empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(columns=BAR_COLUMNS)
+
+def _fill_bars(chunks: Iterable[list], n_hint: int = 0) -> pd.DataFrame:
+    """
+    (epoch초, open, high, low, close, volume) 튜플 청크를 미리 잡은 배열에 채워 DataFrame으로.
+      - ts: int64(ns), 값: (5, n) float64 — 열마다 연속 메모리라 DataFrame이 복사 없이 감싼다
+      - n_hint(COUNT) 보다 많이 오면 2배씩 늘리고, 적으면 잘라낸 뷰를 쓴다
+      - 쿼리가 ORDER BY ts 이므로 정렬하지 않는다. NULL 값은 NaN
+    """
+    cap = max(int(n_hint), 1)
+    ts = np.empty(cap, dtype=np.int64)
+    vals = np.empty((len(BAR_COLUMNS), cap), dtype=np.float64)
+    n = 0
+    for rows in chunks:
+        m = len(rows)
+        if not m:
+            continue
+        if n + m > cap:
+            cap = max(cap * 2, n + m)
+            ts = np.resize(ts, cap)
+            vals = np.concatenate([vals, np.empty((len(BAR_COLUMNS), cap - vals.shape[1]))], axis=1)
+        a = np.array(rows, dtype=np.float64)          # (m, 6) — 청크 크기만큼만 임시 메모리
+        ts[n: n + m] = a[:, 0]
+        vals[:, n: n + m] = a[:, 1:].T
+        n += m
+    if n == 0:
+        return _empty_bars()
+    ts = ts[:n]
+    ts *= 1_000_000_000                               # 초 → ns (제자리)
+    idx = pd.DatetimeIndex(ts.view("datetime64[ns]"), name="ts").tz_localize("UTC")
+    return pd.DataFrame({c: vals[i, :n] for i, c in enumerate(BAR_COLUMNS)}, index=idx, copy=False)
+
+def fetch_bars(engine, asset_id: int, res: str, start: str, end: str, market: str = "crypto",
+               chunk_rows: int | None = None, use_server: bool = True,
+               adjusted: bool = False) -> pd.DataFrame:
+    """
+    [start, end) 바. 로컬 바 서버(scripts/bar_server.py)가 떠 있으면 공유메모리에서 복사 없이,
+    아니면(또는 서버 오류 시) DB에서 읽는다. chunk_rows 생략 시 resources 예산으로 결정.
+    adjusted=True(equity 전용): 저장된 adj_factor를 곱한 조정 OHLC(거래량은 원시). 서버는 원시만 제공하므로 DB에서 읽는다.
+    """
+    if adjusted and market != "equity":
+        raise ValueError(f"adjusted bars are only available for market=equity (got {market})")
+    if use_server and not adjusted:
+        from crypto_backtester.engine.bar_server import fetch_from_server
+        df = fetch_from_server(asset_id, res, start, end, market=market)
+        if df is not None:
+            return df
+    return _fetch_bars_db(engine, asset_id, res, start, end, market=market,
+                          chunk_rows=chunk_rows or _default_chunk("fetch"), adjusted=adjusted)
+
+def _fetch_bars_db(engine, asset_id: int, res: str, start: str, end: str, market: str = "crypto",
+                   chunk_rows: int = FETCH_CHUNK_ROWS, adjusted: bool = False) -> pd.DataFrame:
+    """
+    [start, end) 바를 서버측(unbuffered) 커서로 chunk_rows씩 받아 NumPy 배열에 바로 채운다.
+    ts는 DB에서 epoch 초(정수)로 받아 datetime 객체 생성을 피한다. 결과 index는 UTC DatetimeIndex.
+    """
+    table = resolve_bar_table(market)
+    where = f"FROM `{DB_NAME}`.{table} WHERE asset_id=:aid AND res=:res AND ts>=:start AND ts<:end"
+    params = {"aid": asset_id, "res": res, "start": start, "end": end}
+    px = ("open, high, low, close" if not adjusted else
+          ", ".join(f"{c}*COALESCE(adj_factor, 1)" for c in ("open", "high", "low", "close")))
+    q = text(f"""
+        SELECT TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', ts), {px}, volume
+        {where}
+        ORDER BY ts
+    """)
+    # 같은 트랜잭션(일관된 스냅샷)에서 COUNT → 스트리밍
+    with engine.begin() as conn:
+        n = int(conn.execute(text(f"SELECT COUNT(*) {where}"), params).scalar() or 0)
+        if n == 0:
+            return _empty_bars()
+        result = conn.execution_options(stream_results=True).execute(q, params)
+        try:
+            return _fill_bars(iter(lambda: result.fetchmany(chunk_rows), []), n_hint=n)
+        finally:
+            result.close()
+
+def _fetch_bars_fetchall(engine, asset_id: int, res: str, start: str, end: str, market: str = "crypto") -> pd.DataFrame:
+    # 이전 구현(fetchall → DataFrame → to_datetime → sort). bench_fetch_bars 비교용
     table = resolve_bar_table(market)
     q = text(f"""
         SELECT ts, open, high, low, close, volume
@@ -127,8 +300,11 @@ def fetch_bars(engine, asset_id: int, res: str, start: str, end: str, market: st
     """)
     with engine.begin() as conn:
         rows = conn.execute(q, {"aid": asset_id, "res": res, "start": start, "end": end}).fetchall()
+    return _frame_from_rows(rows)
+
+def _frame_from_rows(rows) -> pd.DataFrame:
     if not rows:
-        return pd.DataFrame(columns=["open","high","low","close","volume"])
+        return _empty_bars()
     df = pd.DataFrame(rows, columns=["ts","open","high","low","close","volume"])
     df["ts"] = pd.to_datetime(df["ts"], utc=True)
     df = df.set_index("ts").sort_index()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import warnings
+from typing import Sequence, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from crypto_backtester.engine.db_utils import fetch_bars
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+BAR_INTERVAL = {"5m": pd.Timedelta("5min"), "1d": pd.Timedelta("1D")}
+# 5m: openTime 라벨(ingest_binance_5m), 1d: UTC 자정 right-close 라벨(resample_to_1d)
+BAR_LABEL = {"5m": "left", "1d": "right"}
+
+# --------- 내부 유틸 ---------
+def _to_ns(ts) -> np.ndarray:
+    idx = pd.DatetimeIndex(pd.to_datetime(ts, utc=True))
+    return idx.as_unit("ns").asi8
+
+def _infer_interval(ts_ns: np.ndarray) -> int:
+    if len(ts_ns) < 2:
+        raise ValueError("need at least 2 bars to infer the bar interval")
+    return int(np.median(np.diff(ts_ns)))
+
+# --------- 윈도 인덱싱 ---------
+def locate_events(bars_ts, events, interval=None, label: str = "left") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정렬된 바 ts에서 각 이벤트를 포함하는 바(anchor)의 위치를 searchsorted로 찾는다.
+    - label='left': 바 ts = 시작 시각 → anchor = ts <= event 인 마지막 바
+    - label='right': 바 ts = 종료 시각 → anchor = ts >= event 인 첫 바
+    - 반환: (anchor 인덱스, 유효 마스크) — 데이터 범위 밖/결측 구간의 이벤트는 invalid
+    """
+    ts = _to_ns(bars_ts)
+    ev = _to_ns(events)
+    step = int(pd.Timedelta(interval).value) if interval is not None else _infer_interval(ts)
+    if label == "left":
+        anchor = np.searchsorted(ts, ev, side="right") - 1
+        ok = anchor >= 0
+        gap = ev - ts[np.clip(anchor, 0, len(ts) - 1)]
+    elif label == "right":
+        anchor = np.searchsorted(ts, ev, side="left")
+        ok = anchor < len(ts)
+        gap = ts[np.clip(anchor, 0, len(ts) - 1)] - ev
+    else:
+        raise ValueError(f"unknown label={label}")
+    ok &= (gap >= 0) & (gap < step)
+    return anchor, ok
+
+def window_view(values: np.ndarray, before: int, after: int) -> np.ndarray:
+    """
+    (T, F) 값 배열 → (T, before+after+1, F) 슬라이딩 뷰(복사 없음).
+    view[i]는 원래 행 i-before … i+after를 가리키며, 범위 밖은 NaN 패딩.
+    """
+    T, F = values.shape
+    padded = np.full((T + before + after, F), np.nan, dtype=np.float64)
+    padded[before: before + T] = values
+    return sliding_window_view(padded, before + after + 1, axis=0).transpose(0, 2, 1)
+
+def event_windows(bars: pd.DataFrame, events, before: int, after: int,
+                  fields: Sequence[str] = FIELDS, interval=None, label: str = "left"
+                  ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    이벤트별 ±T 윈도를 (events × offsets × fields) 3D 배열로 모은다.
+    offset 0 = 이벤트가 속한 바, offset -1 = 이벤트 직전에 마감된 바.
+    반환: (windows, valid) — invalid 이벤트의 윈도는 NaN.
+    """
+    anchor, valid = locate_events(bars.index, events, interval=interval, label=label)
+    view = window_view(bars[list(fields)].to_numpy(dtype=np.float64), before, after)
+    win = view[np.clip(anchor, 0, len(bars) - 1)]
+    win[~valid] = np.nan
+    return win, valid
+
+# --------- 반응 지표(배치) ---------
+def window_reactions(win: np.ndarray, before: int, fields: Sequence[str] = FIELDS) -> pd.DataFrame:
+    """
+    윈도 배열에서 이벤트별 반응을 한 번에 계산한다(기준가 = offset -1 close).
+    - ret_pre/ret_post: 윈도 시작 → 기준 / 기준 → 윈도 끝 수익률
+    - max_up/max_down: 사후 구간 high 최대 / low 최소의 기준 대비 변화
+    - vol_pre/vol_post: 구간별 바 로그수익률 표준편차, vol_ratio = post/pre
+    - volume_pre/volume_post: 구간 평균 거래량, volume_ratio = post/pre
+    """
+    if before < 2:
+        raise ValueError("before must be >= 2 (pre-event baseline needs 2+ bars)")
+    col = {f: i for i, f in enumerate(fields)}
+    close = win[:, :, col["close"]]
+    base = close[:, before - 1]
+    lr = np.diff(np.log(close), axis=1)              # (E, W-1)
+    pre_lr, post_lr = lr[:, : before - 1], lr[:, before - 1:]
+    # invalid 이벤트(전부 NaN 윈도)의 nanstd/nanmean 경고는 무시
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        out = {
+            "ret_pre": base / close[:, 0] - 1.0,
+            "ret_post": close[:, -1] / base - 1.0,
+            "vol_pre": np.nanstd(pre_lr, axis=1, ddof=1) if pre_lr.shape[1] > 1 else np.full(len(win), np.nan),
+            "vol_post": np.nanstd(post_lr, axis=1, ddof=1),
+        }
+        if "high" in col:
+            out["max_up"] = np.nanmax(win[:, before:, col["high"]], axis=1) / base - 1.0
+        if "low" in col:
+            out["max_down"] = np.nanmin(win[:, before:, col["low"]], axis=1) / base - 1.0
+        out["vol_ratio"] = out["vol_post"] / out["vol_pre"]
+        if "volume" in col:
+            vol = win[:, :, col["volume"]]
+            out["volume_pre"] = np.nanmean(vol[:, :before], axis=1)
+            out["volume_post"] = np.nanmean(vol[:, before:], axis=1)
+            out["volume_ratio"] = out["volume_post"] / out["volume_pre"]
+    return pd.DataFrame(out)
+
+def reaction_path(win: np.ndarray, before: int, fields: Sequence[str] = FIELDS) -> np.ndarray:
+    """(E, W) 누적 수익률 경로: close[offset] / close[-1] - 1."""
+    close = win[:, :, list(fields).index("close")]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return close / close[:, before - 1: before] - 1.0
+
+# --------- DB 로더 연동 ---------
+def load_event_reactions(engine, asset_id: int, res: str, events, before: int, after: int,
+                         market: str = "crypto") -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    이벤트 범위를 덮는 바를 한 번만 fetch_bars로 읽고 윈도/반응을 배치 계산한다.
+    반환: (이벤트별 반응 DataFrame(index=event ts), windows)
+    """
+    ev = pd.DatetimeIndex(pd.to_datetime(events, utc=True))
+    step = BAR_INTERVAL[res]
+    lo = (ev.min() - (before + 1) * step).tz_convert(None)
+    hi = (ev.max() + (after + 2) * step).tz_convert(None)
+    bars = fetch_bars(engine, asset_id, res, lo.isoformat(), hi.isoformat(), market=market)
+    if bars.empty:
+        raise RuntimeError("no data")
+    win, valid = event_windows(bars, ev, before, after, interval=step, label=BAR_LABEL[res])
+    react = window_reactions(win, before)
+    react.index = ev
+    react["valid"] = valid
+    return react, win
@@ -0,0 +1,202 @@
+from __future__ import annotations
+import os, json, hashlib, shutil, tempfile, time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from numpy.lib.stride_tricks import sliding_window_view
+
+from crypto_backtester.engine.indicators import macd, rsi, sma_bank, ema_bank, atr_bank
+from crypto_backtester.engine.signal_cache import bars_digest
+
+# 피처 계산 코드가 바뀌면 올린다(같은 spec이라도 버전 해시가 달라짐)
+FEATURE_CODE_VERSION = 1
+
+DEFAULT_SPEC: Dict[str, Any] = {
+    "returns": [1, 12],
+    "sma": [20, 60],
+    "ema": [12, 26],
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+    "atr": [14],
+    "rsi": [14],
+    "log_volume": True,
+    "target_horizon": 12,   # 라벨: 향후 h바 로그수익률
+}
+
+def spec_version(spec: Dict[str, Any]) -> str:
+    payload = json.dumps({"spec": spec, "code": FEATURE_CODE_VERSION}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+# --------- 피처 계산 ---------
+def feature_columns(df: pd.DataFrame, spec: Dict[str, Any]) -> Iterator[Tuple[str, pd.Series]]:
+    """
+    engine/indicators의 지표를 스케일 불변 형태로 한 열씩 생성한다(제너레이터: 열 단위로 바로 기록).
+    가격 기준 지표는 close 대비 비율, RSI는 /100, 거래량은 log1p.
+    """
+    close = df["close"].astype(float)
+    for k in spec.get("returns", []):
+        yield f"logret_{k}", np.log(close / close.shift(k))
+    sb = sma_bank(close, spec.get("sma", []))
+    for n in sb.columns:
+        yield f"sma_{n}", close / sb[n] - 1.0
+    eb = ema_bank(close, spec.get("ema", []))
+    for n in eb.columns:
+        yield f"ema_{n}", close / eb[n] - 1.0
+    m = spec.get("macd")
+    if m:
+        line, sig, hist = macd(close, m["fast"], m["slow"], m["signal"])
+        yield "macd", line / close
+        yield "macd_signal", sig / close
+        yield "macd_hist", hist / close
+    ab = atr_bank(df, spec.get("atr", []))
+    for n in ab.columns:
+        yield f"atr_{n}", ab[n] / close
+    for n in spec.get("rsi", []):
+        yield f"rsi_{n}", rsi(close, n).astype(float) / 100.0
+    if spec.get("log_volume"):
+        yield "log_volume", np.log1p(df["volume"].astype(float))
+
+def _target(df: pd.DataFrame, horizon: int) -> pd.Series:
+    close = df["close"].astype(float)
+    return np.log(close.shift(-horizon) / close)
+
+# --------- 저장(memmap .npy + manifest) ---------
+DATA_KEY_LEN = 16       # 경로에 쓰는 입력 바 해시 길이
+
+def store_dir(root: str | Path, spec: Dict[str, Any], symbol: str, res: str, data: Optional[str] = None) -> Path:
+    """<root>/<spec 해시>/<symbol>_<res>/[<입력 바 해시>] — data 없으면 심볼 디렉터리(여러 구간 버전의 부모)."""
+    base = Path(root) / spec_version(spec) / f"{symbol}_{res}"
+    return base / data[:DATA_KEY_LEN] if data else base
+
+def _write_store(out: Path, df: pd.DataFrame, spec: Dict[str, Any], symbol: str, res: str, data: str) -> None:
+    cols = [name for name, _ in feature_columns(df.iloc[:0], spec)]
+    T, F = len(df), len(cols)
+    X = open_memmap(str(out / "X.npy"), mode="w+", dtype=np.float32, shape=(T, F))
+    for j, (_, s) in enumerate(feature_columns(df, spec)):
+        X[:, j] = s.to_numpy(dtype=np.float64)
+    y = _target(df, int(spec["target_horizon"])).to_numpy(dtype=np.float32)
+    valid = ~np.isnan(X).any(axis=1)
+    X.flush()
+    del X
+    np.save(out / "y.npy", y)
+    np.save(out / "valid.npy", valid)
+    np.save(out / "ts.npy", pd.DatetimeIndex(df.index).as_unit("ns").asi8)
+
+    manifest = {
+        "version": spec_version(spec), "spec": spec, "code_version": FEATURE_CODE_VERSION,
+        "symbol": symbol, "res": res, "columns": cols, "rows": T, "dtype": "float32", "data": data,
+        "start": pd.Timestamp(df.index[0]).isoformat(), "end": pd.Timestamp(df.index[-1]).isoformat(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+def build_feature_store(df: pd.DataFrame, root: str | Path, symbol: str, res: str,
+                        spec: Optional[Dict[str, Any]] = None, overwrite: bool = False) -> Path:
+    """
+    바 DataFrame → <root>/<spec 해시>/<symbol>_<res>/<입력 바 해시>/ 에 float32 피처를 1회 기록한다.
+      - X.npy (T×F float32, memmap으로 열 단위 기록), y.npy (T, float32), ts.npy (int64 ns), valid.npy (bool)
+      - manifest.json: spec·열 이름·행 수·기간·입력 바 해시(data)
+    구간/내용이 다른 입력은 다른 디렉터리가 되므로 다른 job의 저장소를 덮지 않는다.
+    같은 입력이 이미 있으면(overwrite=False) 재계산 없이 경로만 반환.
+    기록은 옆의 임시 디렉터리에 한 뒤 rename으로 교체 → 이미 memmap으로 연 학습 job은 예전 파일(inode)을 계속 읽는다.
+    """
+    spec = spec or DEFAULT_SPEC
+    if df.empty:
+        raise ValueError("empty bars")
+    data = bars_digest(df)
+    out = store_dir(root, spec, symbol, res, data)
+    if (out / "manifest.json").exists() and not overwrite:
+        return out
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=out.parent, prefix=f".{out.name}.tmp-"))
+    try:
+        _write_store(tmp, df, spec, symbol, res, data)
+        old = None
+        if out.exists():                            # overwrite(또는 manifest 없는 잔여물): 비켜 두고 교체
+            old = Path(tempfile.mkdtemp(dir=out.parent, prefix=f".{out.name}.old-"))
+            os.replace(out, old / "store")
+        try:
+            os.rename(tmp, out)
+        except OSError:
+            if not (out / "manifest.json").exists():   # 동시에 같은 입력을 만든 다른 프로세스가 먼저 끝난 경우만 허용
+                raise
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)  # 열린 매핑은 unlink된 파일을 계속 유지
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return out
+
+# --------- 읽기(zero-copy) ---------
+class FeatureStore:
+    """memmap으로 연 피처 저장소. MySQL/지표 재계산 없이 학습 윈도를 제공한다."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / "manifest.json").read_text(encoding="utf-8"))
+        self.columns: List[str] = self.manifest["columns"]
+        self.horizon = int(self.manifest["spec"]["target_horizon"])
+        self.X = np.load(self.path / "X.npy", mmap_mode="r")
+        self.y = np.load(self.path / "y.npy", mmap_mode="r")
+        self.valid = np.load(self.path / "valid.npy", mmap_mode="r")
+        self.ts = np.load(self.path / "ts.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    def windows(self, window: int) -> np.ndarray:
+        """(T-window+1, window, F) 슬라이딩 뷰 — memmap 위의 strided view라 복사가 없다."""
+        return sliding_window_view(self.X, window, axis=0).transpose(0, 2, 1)
+
+    def valid_starts(self, window: int, start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """
+        윈도 전체가 유효(NaN 없음)이고 라벨(윈도 마지막 바 기준 y)도 유효한 시작 인덱스.
+        start/end(UTC, end exclusive)로 윈도 마지막 바의 시각을 제한(학습/검증 분할).
+        """
+        bad = np.concatenate([[0], np.cumsum(~np.asarray(self.valid))])
+        n = len(self) - window + 1
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        starts = np.arange(n)
+        ok = (bad[starts + window] - bad[starts]) == 0
+        last = starts + window - 1
+        ok &= ~np.isnan(np.asarray(self.y[last]))
+        ts_last = np.asarray(self.ts)[last]
+        if start is not None:
+            ok &= ts_last >= pd.Timestamp(start, tz="UTC").value
+        if end is not None:
+            ok &= ts_last < pd.Timestamp(end, tz="UTC").value
+        return starts[ok]
+
+    def iter_batches(self, window: int, batch_size: int = 256, shuffle: bool = False,
+                     seed: Optional[int] = None, start: Optional[str] = None, end: Optional[str] = None
+                     ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(xb: (B, window, F) float32, yb: (B,)) 배치를 스트리밍. 배치마다 필요한 윈도만 복사한다."""
+        view = self.windows(window)
+        idx = self.valid_starts(window, start=start, end=end)
+        if shuffle:
+            np.random.default_rng(seed).shuffle(idx)
+        for i in range(0, len(idx), batch_size):
+            b = idx[i: i + batch_size]
+            yield np.ascontiguousarray(view[b]), np.asarray(self.y[b + window - 1])
+
+def list_feature_stores(root: str | Path, spec: Optional[Dict[str, Any]], symbol: str, res: str) -> List[Path]:
+    """완성된(manifest 있는) 구간 버전들, 오래된 것 → 최신 순."""
+    base = store_dir(root, spec or DEFAULT_SPEC, symbol, res)
+    if not base.is_dir():
+        return []
+    done = [p for p in base.iterdir() if not p.name.startswith(".") and (p / "manifest.json").exists()]
+    return sorted(done, key=lambda p: (p / "manifest.json").stat().st_mtime)
+
+def open_feature_store(root: str | Path, spec: Optional[Dict[str, Any]], symbol: str, res: str,
+                       data: Optional[str] = None) -> FeatureStore:
+    """data(입력 바 해시, build_feature_store가 만든 디렉터리 이름)를 주면 그 버전, 없으면 가장 최근에 만든 버전."""
+    if data:
+        path = store_dir(root, spec or DEFAULT_SPEC, symbol, res, data)
+        if not (path / "manifest.json").exists():
+            raise FileNotFoundError(f"feature store not built: {path}")
+        return FeatureStore(path)
+    found = list_feature_stores(root, spec, symbol, res)
+    if not found:
+        raise FileNotFoundError(f"feature store not built: {store_dir(root, spec or DEFAULT_SPEC, symbol, res)}")
+    return FeatureStore(found[-1])
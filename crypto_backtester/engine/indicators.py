@@ -1,4 +1,6 @@
 from __future__ import annotations
+from typing import Iterable, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
 def sma(close: pd.Series, n: int) -> pd.Series:
@@ -13,8 +15,7 @@ def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
     hist = macd_line - signal_line
     return macd_line, signal_line, hist
 
-def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
-    """Wilder's ATR (EWMA with alpha=1/n)"""
+def true_range(df: pd.DataFrame) -> pd.Series:
     high, low, close = df["high"], df["low"], df["close"]
     prev_close = close.shift(1)
     tr = pd.concat([
@@ -22,6 +23,11 @@ def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
         (high - prev_close).abs(),
         (low - prev_close).abs()
     ], axis=1).max(axis=1)
+    return tr
+
+def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
+    """Wilder's ATR (EWMA with alpha=1/n)"""
+    tr = true_range(df)
     atr_ = tr.ewm(alpha=1.0/n, adjust=False, min_periods=n).mean()
     return atr_
 
@@ -34,3 +40,179 @@ def rsi(close: pd.Series, n: int = 14) -> pd.Series:
     rs = avg_gain / (avg_loss.replace(0, pd.NA))
     rsi_ = 100 - (100 / (1 + rs))
     return rsi_
+
+# --------- 뱅크: 여러 파라미터를 한 번에 (bars × params) ---------
+# 결과 DataFrame의 열 = 파라미터 → bank[20] 이 sma(close, 20)과 같은 Series.
+# min_periods NaN 규칙은 위 단일 함수(pandas rolling/ewm)와 동일하게 맞춘다.
+# 내부 버퍼는 (params, bars) C-연속 → .T 로 감싸면 pandas 블록과 같은 배치라 복사 없이 DataFrame이 된다.
+_EWM_BLOCK = 16
+
+def _bank_frame(buf: np.ndarray, index, columns) -> pd.DataFrame:
+    return pd.DataFrame(buf.T, index=index, columns=columns, copy=False)
+
+def _valid_count(x: np.ndarray) -> np.ndarray:
+    """c[t] = x[:t]의 유효값 개수 (길이 T+1) — 창 [t-n+1, t]의 개수는 c[t+1]-c[t+1-n]."""
+    return np.concatenate([[0], np.cumsum(~np.isnan(x))])
+
+def _short_window(c: np.ndarray, n: int) -> np.ndarray:
+    """t >= n-1 구간에서 창 안에 NaN이 있는 위치(True)."""
+    T = len(c) - 1
+    return (c[n:] - c[:T - n + 1]) != n
+
+def sma_bank(close: pd.Series, windows: Iterable[int]) -> pd.DataFrame:
+    """공유 누적합 1회로 모든 창의 SMA. 창 안에 NaN이 하나라도 있으면 NaN(rolling min_periods=n)."""
+    windows = [int(n) for n in windows]
+    x = close.to_numpy(dtype=np.float64)
+    T = len(x)
+    valid = ~np.isnan(x)
+    has_nan = not valid.all()
+    ref = x[valid][0] if valid.any() else 0.0          # 기준값을 빼서 누적합 자릿수 손실을 줄임
+    cs = np.concatenate([[0.0], np.cumsum(np.where(valid, x - ref, 0.0))])
+    c = _valid_count(x) if has_nan else None
+    buf = np.full((len(windows), T), np.nan)
+    for k, n in enumerate(windows):
+        if n > T or n < 1:
+            continue
+        row = buf[k, n - 1:]
+        np.subtract(cs[n:], cs[:T - n + 1], out=row)
+        row /= n
+        row += ref
+        if has_nan:
+            row[_short_window(c, n)] = np.nan
+    return _bank_frame(buf, close.index, pd.Index(windows, name="n"))
+
+def _linear_scan(E: np.ndarray, coef: np.ndarray) -> None:
+    """행마다 E[:, i] += coef·E[:, i-1] 누적(제자리, 배 늘리기). coef^d가 무시할 만해지면 멈춘다."""
+    d, cd = 1, coef.astype(np.float64).copy()
+    n = E.shape[1]
+    with np.errstate(under="ignore"):
+        while d < n and cd.max() > 1e-18:
+            E[:, d:] += cd[:, None] * E[:, :-d]
+            d *= 2
+            cd = cd * cd
+
+def _ewm_rows(X: np.ndarray, alpha: np.ndarray, min_periods: np.ndarray, block: int = _EWM_BLOCK) -> np.ndarray:
+    """
+    행마다 다른 alpha로 ewm(adjust=False, ignore_na=False).mean()을 동시에 계산한다 (→ K×T).
+    X: (T,) 이면 모든 행이 같은 입력(span 뱅크), (K, T)면 행별 입력(MACD signal).
+    y_t = (1-α)·y_{t-1} + α·x_t, y_첫유효 = x_첫유효 를 block 길이로 나눠
+      1) 블록별 끝 값(0에서 시작 가정) → 블록 단위 선형 스캔으로 실제 끝 값(= 다음 블록의 carry)
+      2) [블록 입력 | carry] × [하삼각 감쇠 | a^(i+1)] 행렬 곱 한 번으로 최종 값(BLAS)
+    앞쪽 NaN은 첫 유효값부터 시작. 중간 NaN이 있는 행은 pandas 가중 규칙(간격만큼 감쇠)이 달라 pandas로 계산.
+    """
+    K, T = len(alpha), X.shape[-1]
+    if T == 0 or K == 0:
+        return np.full((K, T), np.nan)
+    shared = X.ndim == 1
+    isnan = np.isnan(X)
+    n_nan = np.broadcast_to(isnan.sum(axis=-1), (K,))
+    first = np.broadcast_to(np.where(isnan.all(axis=-1), T, np.argmax(~isnan, axis=-1)), (K,))
+    gap = n_nan > first                              # 첫 유효값 이후에도 NaN이 있음
+    fast = np.flatnonzero(~gap & (first < T))
+    if len(fast) == 0:
+        Y = np.full((0, T), np.nan)
+    else:
+        F, B = len(fast), block
+        a = 1.0 - alpha[fast]
+        nb = -(-T // B)
+        src = np.zeros((1 if shared else F, nb * B))
+        src[:, :T] = np.where(isnan, 0.0, X) if shared else np.where(isnan[fast], 0.0, X[fast])
+        bp = np.empty((F, nb, B + 1))
+        np.multiply(alpha[fast][:, None, None], src.reshape(-1, nb, B), out=bp[:, :, :B])
+        f0 = first[fast]
+        bp[np.arange(F), f0 // B, f0 % B] = src[np.arange(F) if not shared else 0, f0]   # y_f = x_f
+        j = np.arange(B)
+        lag = j[:, None] - j[None, :]
+        with np.errstate(under="ignore"):
+            L = np.empty((F, B, B + 1))
+            L[:, :, :B] = np.where(lag >= 0, a[:, None, None] ** np.maximum(lag, 0), 0.0)
+            L[:, :, B] = a[:, None] ** (j[None, :] + 1)
+            ends = np.matmul(bp[:, :, :B], L[:, B - 1, :B, None])[:, :, 0]
+            _linear_scan(ends, a ** B)
+        bp[:, 0, B] = 0.0
+        bp[:, 1:, B] = ends[:, :-1]
+        Y = np.matmul(bp, L.transpose(0, 2, 1)).reshape(F, nb * B)[:, :T]
+        for i, k in enumerate(fast):
+            Y[i, : first[k] + int(min_periods[k]) - 1] = np.nan
+    if len(fast) == K:
+        return Y
+    out = np.full((K, T), np.nan)
+    out[fast] = Y
+    for k in np.flatnonzero(gap):
+        xk = X if shared else X[k]
+        out[k] = pd.Series(xk).ewm(alpha=float(alpha[k]), adjust=False,
+                                   min_periods=int(min_periods[k])).mean().to_numpy()
+    return out
+
+def ema_bank(close: pd.Series, spans: Iterable[int]) -> pd.DataFrame:
+    """여러 span의 EMA(adjust=False, min_periods=span)를 한 번에."""
+    spans = [int(n) for n in spans]
+    x = close.to_numpy(dtype=np.float64)
+    sp = np.asarray(spans, dtype=np.float64)
+    buf = _ewm_rows(x, 2.0 / (sp + 1.0), sp.astype(int))
+    return _bank_frame(buf, close.index, pd.Index(spans, name="span"))
+
+def macd_bank(close: pd.Series, combos: Iterable[Tuple[int, int, int]]) -> pd.DataFrame:
+    """
+    (fast, slow, signal) 조합별 MACD. 고유 span의 EMA는 한 번만 계산해 공유한다.
+    열: MultiIndex (field ∈ line/signal/hist, fast, slow, signal)
+        bank["hist"] → 조합별 히스토그램 (bars × 조합), bank["line", 12, 26, 9] → macd(...)[0]
+    """
+    combos = [(int(f), int(s), int(g)) for f, s, g in combos]
+    spans = sorted({v for f, s, _ in combos for v in (f, s)})
+    row = {n: i for i, n in enumerate(spans)}
+    x = close.to_numpy(dtype=np.float64)
+    sp = np.asarray(spans, dtype=np.float64)
+    E = _ewm_rows(x, 2.0 / (sp + 1.0), sp.astype(int))
+    C = len(combos)
+    buf = np.empty((3 * C, len(x)))
+    line, sig, hist = buf[:C], buf[C: 2 * C], buf[2 * C:]
+    for i, (f, s, _) in enumerate(combos):
+        np.subtract(E[row[f]], E[row[s]], out=line[i])
+    g = np.asarray([c[2] for c in combos], dtype=np.float64)
+    sig[:] = _ewm_rows(line, 2.0 / (g + 1.0), g.astype(int))
+    np.subtract(line, sig, out=hist)
+    cols = pd.MultiIndex.from_tuples(
+        [(field, f, s, g) for field in ("line", "signal", "hist") for f, s, g in combos],
+        names=["field", "fast", "slow", "signal"])
+    return _bank_frame(buf, close.index, cols)
+
+def atr_bank(df: pd.DataFrame, windows: Iterable[int], tr: pd.Series | None = None) -> pd.DataFrame:
+    """True range 1회 계산(tr로 재사용 가능) 후 여러 n의 Wilder ATR."""
+    windows = [int(n) for n in windows]
+    tr = true_range(df) if tr is None else tr
+    x = tr.to_numpy(dtype=np.float64)
+    n = np.asarray(windows)
+    buf = _ewm_rows(x, 1.0 / n.astype(np.float64), n)
+    return _bank_frame(buf, df.index, pd.Index(windows, name="n"))
+
+def rolling_max_bank(s: pd.Series, windows: Sequence[int]) -> pd.DataFrame:
+    """
+    희소 테이블(2^k 창 최대값을 배로 늘려가며)로 여러 창의 rolling max를 한 번에.
+    창 n = 길이 2^k 구간 두 개(겹침 허용)의 max, k=floor(log2 n). NaN 규칙은 rolling(n, min_periods=n).
+    """
+    windows = [int(n) for n in windows]
+    x = s.to_numpy(dtype=np.float64)
+    T = len(x)
+    buf = np.full((len(windows), T), np.nan)
+    ok = [n for n in windows if 1 <= n <= T]
+    if ok:
+        levels = [x]                                  # levels[k][t] = max(x[t-2^k+1 .. t]) (NaN 무시)
+        for k in range(1, int(np.log2(max(ok))) + 1):
+            h = 1 << (k - 1)
+            prev = levels[-1]
+            cur = prev.copy()
+            np.fmax(prev[h:], prev[:-h], out=cur[h:])
+            levels.append(cur)
+        has_nan = np.isnan(x).any()
+        c = _valid_count(x) if has_nan else None
+        for j, n in enumerate(windows):
+            if n not in ok:
+                continue
+            k = int(np.log2(n))
+            lv, off = levels[k], n - (1 << k)
+            row = buf[j, n - 1:]
+            np.fmax(lv[n - 1:], lv[n - 1 - off: T - off], out=row)
+            if has_nan:
+                row[_short_window(c, n)] = np.nan
+    return _bank_frame(buf, s.index, pd.Index(windows, name="n"))
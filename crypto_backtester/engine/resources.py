@@ -0,0 +1,216 @@
+from __future__ import annotations
+import os, threading, time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import load_conf
+
+# 작업별 바(행)당 메모리 추정치(bytes). 실측 RSS가 summary["resources"]에 함께 남으니 보고 conf에서 조정.
+#   fetch       : 결과 DataFrame(ts int64 + OHLCV float64) + 인덱스
+#   fetch_row   : 스트리밍 청크 1행의 임시 비용(드라이버 튜플/파이썬 float + 변환 배열)
+#   upsert_row  : 레코드 dict + 드라이버 파라미터 직렬화
+#   backtest    : 바 + 지표/시그널 + 에쿼티 시계열(파이썬 루프 객체 포함)
+#   report      : 리포트 1건(run 산출물 읽기)당 — 바 수와 무관한 고정값
+DEFAULT_BYTES_PER_BAR: Dict[str, int] = {
+    "fetch": 56, "fetch_row": 320, "upsert_row": 1500, "backtest": 400, "ingest": 2000, "report": 0,
+}
+DEFAULTS: Dict[str, Any] = {
+    "memory_mb": None,          # None → 사용 가능 메모리(MemAvailable/cgroup 잔여)의 memory_fraction
+    "memory_fraction": 0.5,
+    "cpu": None,                # None → os.cpu_count()
+    "chunk_fraction": 0.1,      # 청크 임시 메모리 상한 = 예산 × 이 비율
+    "sample_sec": 0.2,
+}
+CHUNK_MIN, CHUNK_MAX = 1_000, 200_000
+MAX_DECISIONS = 200
+RES_SECONDS = {"5m": 300, "1h": 3600, "1d": 86400}
+
+# --------- 측정 ---------
+def _read_kb(path: str, key: str) -> Optional[int]:
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def _cgroup_free() -> Optional[int]:
+    # cgroup v2 컨테이너 한도(max가 아니면) - 현재 사용량
+    base = Path("/sys/fs/cgroup")
+    try:
+        limit = (base / "memory.max").read_text().strip()
+        if limit == "max":
+            return None
+        return int(limit) - int((base / "memory.current").read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+def available_bytes() -> int:
+    """지금 쓸 수 있는 메모리 추정: /proc/meminfo MemAvailable 과 cgroup 잔여 중 작은 값."""
+    cands = [v for v in (_read_kb("/proc/meminfo", "MemAvailable"), _cgroup_free()) if v is not None]
+    if not cands:
+        try:
+            cands = [os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")]
+        except (ValueError, OSError, AttributeError):
+            cands = [2 * 1024 ** 3]
+    return max(0, min(cands))
+
+def rss_bytes() -> int:
+    """현재 프로세스 RSS. /proc이 없으면 최대 RSS(getrusage)로 대신한다."""
+    v = _read_kb("/proc/self/status", "VmRSS")
+    if v is not None:
+        return v
+    import resource, sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+class RssSampler:
+    """백그라운드 스레드로 RSS를 주기적으로 읽어 peak/평균을 기록한다(with 블록 또는 start/stop)."""
+
+    def __init__(self, interval: float = DEFAULTS["sample_sec"]):
+        self.interval = float(interval)
+        self.start_rss = self.peak = self.last = rss_bytes()
+        self.samples = 0
+        self._total = 0
+        self._stop = threading.Event()
+        self._t: Optional[threading.Thread] = None
+        self.started = time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> int:
+        v = rss_bytes()
+        self.last, self.peak = v, max(self.peak, v)
+        self.samples += 1
+        self._total += v
+        return v
+
+    def start(self) -> "RssSampler":
+        self._t = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._t.start()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """샘플링 스레드 종료(여러 번 불러도 된다)."""
+        if not self._stop.is_set():
+            self._stop.set()
+            if self._t is not None:
+                self._t.join()
+            self.sample()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        mb = 1024 * 1024
+        return {
+            "start_mb": round(self.start_rss / mb, 1), "peak_mb": round(self.peak / mb, 1),
+            "delta_mb": round((self.peak - self.start_rss) / mb, 1),
+            "mean_mb": round(self._total / max(self.samples, 1) / mb, 1),
+            "samples": self.samples, "elapsed_sec": round(time.time() - self.started, 3),
+        }
+
+    def __enter__(self) -> "RssSampler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# --------- 결정 ---------
+def estimate_bars(res: str, start: str, end: str) -> int:
+    """[start, end) 구간의 최대 바 수(빈 구간 없다고 가정)."""
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    return max(0, int(span // RES_SECONDS.get(res, 300)))
+
+def _clamp(v: float, lo: int, hi: int) -> int:
+    return int(max(lo, min(hi, v)))
+
+class ResourceGovernor:
+    """
+    메모리/CPU 예산 안에서 청크 크기와 워커 수를 고르고, 결정 내역을 남긴다(report → summary["resources"]).
+    예산 = conf resources.memory_mb (없으면 사용 가능 메모리 × memory_fraction), 결정 시점의 RSS 증가분을 뺀 나머지를 쓴다.
+    """
+
+    def __init__(self, memory_mb: Optional[float] = None, cpu: Optional[int] = None,
+                 bytes_per_bar: Optional[Dict[str, int]] = None,
+                 memory_fraction: float = DEFAULTS["memory_fraction"],
+                 chunk_fraction: float = DEFAULTS["chunk_fraction"],
+                 sample_sec: float = DEFAULTS["sample_sec"]):
+        self.budget = int(memory_mb * 1024 * 1024) if memory_mb else int(available_bytes() * memory_fraction)
+        self.cpu = int(cpu or os.cpu_count() or 1)
+        self.bpb = {**DEFAULT_BYTES_PER_BAR, **(bytes_per_bar or {})}
+        self.chunk_fraction = float(chunk_fraction)
+        self.sample_sec = float(sample_sec)
+        self.base_rss = rss_bytes()
+        self.decisions: List[Dict[str, Any]] = []
+        self.sampler: Optional[RssSampler] = None
+
+    @classmethod
+    def from_conf(cls, conf: Optional[Dict[str, Any]] = None) -> "ResourceGovernor":
+        c = {**DEFAULTS, **((conf if conf is not None else load_conf()).get("resources") or {})}
+        return cls(memory_mb=c.get("memory_mb"), cpu=c.get("cpu"), bytes_per_bar=c.get("bytes_per_bar"),
+                   memory_fraction=c["memory_fraction"], chunk_fraction=c["chunk_fraction"],
+                   sample_sec=c["sample_sec"])
+
+    def free(self) -> int:
+        """예산 중 남은 바이트(이 governor 생성 이후 늘어난 RSS를 뺌)."""
+        return max(0, self.budget - max(0, rss_bytes() - self.base_rss))
+
+    def _log(self, what: str, value: int, **why) -> int:
+        self.decisions.append({"what": what, "value": int(value), **why})
+        del self.decisions[:-MAX_DECISIONS]            # 장기 실행 프로세스(tail, 서버)에서 무한히 쌓이지 않도록
+        return int(value)
+
+    def fetch_chunk_rows(self, est_rows: Optional[int] = None) -> int:
+        free = self.free()
+        rows = _clamp(free * self.chunk_fraction / self.bpb["fetch_row"], CHUNK_MIN, CHUNK_MAX)
+        why: Dict[str, Any] = {"free_mb": round(free / 2**20, 1)}
+        if est_rows is not None:
+            rows = min(rows, max(est_rows, CHUNK_MIN))
+            need = est_rows * (self.bpb["fetch"] + self.bpb["backtest"])
+            why.update(est_rows=int(est_rows), est_mb=round(need / 2**20, 1), over_budget=bool(need > free))
+        return self._log("fetch_chunk_rows", rows, **why)
+
+    def upsert_chunk_rows(self) -> int:
+        free = self.free()
+        rows = _clamp(free * self.chunk_fraction / self.bpb["upsert_row"], CHUNK_MIN, CHUNK_MAX)
+        return self._log("upsert_chunk_rows", rows, free_mb=round(free / 2**20, 1))
+
+    def workers(self, job: str, bars_per_job: int = 0, requested: Optional[int] = None,
+                io_bound: bool = False) -> int:
+        """
+        동시 워커 수. requested를 주면 그대로 쓰고(권장값은 기록만), 없으면 권장값
+        = min(CPU(또는 I/O 작업이면 CPU×4), 남은 예산 / 작업당 추정 메모리), 최소 1.
+        """
+        free = self.free()
+        per_job = max(1, self.bpb.get(job, 0) * int(bars_per_job))
+        cpu_cap = self.cpu * (4 if io_bound else 1)
+        recommended = max(1, min(cpu_cap, free // per_job))
+        n = int(requested) if requested else recommended
+        return self._log(f"workers:{job}", max(1, n), cpu=self.cpu, requested=requested,
+                         recommended=int(recommended), over_budget=bool(n * per_job > free),
+                         per_job_mb=round(per_job / 2**20, 2), free_mb=round(free / 2**20, 1))
+
+    def start_sampling(self) -> RssSampler:
+        self.sampler = RssSampler(self.sample_sec).start()
+        return self.sampler
+
+    def stop_sampling(self) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def report(self) -> Dict[str, Any]:
+        rss = self.sampler.stop() if self.sampler is not None else None
+        out = {"budget_mb": round(self.budget / 2**20, 1), "cpu": self.cpu, "decisions": self.decisions}
+        if rss is not None:
+            out["rss"] = rss
+        return out
+
+@lru_cache(maxsize=1)
+def default_governor() -> ResourceGovernor:
+    """conf 기준 프로세스 공용 governor(청크 크기 기본값 결정용)."""
+    return ResourceGovernor.from_conf()
@@ -9,7 +9,11 @@ import matplotlib
 matplotlib.use("Agg")  # 헤드리스 환경 렌더링
 import matplotlib.pyplot as plt
 
-from crypto_backtester.engine.db_utils import get_engine, ensure_asset, fetch_bars
+from crypto_backtester.engine.db_utils import get_engine, ensure_asset, fetch_bars, load_conf
+from crypto_backtester.engine.signal_cache import SignalCache, compute_signals
+from crypto_backtester.engine.artifacts import ARTIFACT_FORMATS, RUN_FILE, write_run_artifact
+from crypto_backtester.engine.cost_sensitivity import extract_trades, cost_surface, surface_frame, plot_cost_surface
+from crypto_backtester.engine.resources import ResourceGovernor, estimate_bars
 try:
     import yaml  # params.yaml 저장용
 except Exception:
@@ -48,50 +52,10 @@ def _one_line(run_id: str, symbol: str, res: str, strategy: str,
             f"PnL={pct(pnl)} Sharpe={sharpe:.2f} MDD={pct(mdd)} Trades={trades} "
             f"Fee={int(fee_bps)}bps Slip={int(slip_bps)}bps Period={start}→{end}")
 
-# --------- 공개 API ---------
-def run_backtest(
-    symbol: str, res: str, start: str, end: str,
-    strategy_name: str, strategy_params: Dict[str, Any],
-    start_cash: float, fee_bps: float, slip_bps: float,
-    liquidate_on_end: bool = True, db_logging: bool = True,
-    artifact_root: str | None = None,   # 실험 산출물 루트(exp-dir). None이면 experiments/<ES_EXP_NAME>/runs/<run_id> 사용
-    save_fig: bool = True
-) -> Dict[str, Any]:
-    """
-    실행 결과 산출물 저장 정책(통일):
-      - artifact_root 지정: <artifact_root>/runs/<run_id>/
-      - artifact_root 미지정: crypto_backtester/experiments/<ES_EXP_NAME 또는 UNNAMED-EXP>/runs/<run_id>/
-      - 저장물: equity.csv, orders.csv, summary.json, params.yaml, figures/{equity.png, drawdown.png}
-    """
-    # 데이터 로드
-    eng = get_engine()
-    aid = ensure_asset(eng, symbol, market="crypto")
-    df = fetch_bars(eng, aid, res, start, end, market="crypto")
-    if df.empty:
-        raise RuntimeError("no data")
-
-    # 전략 로드
-    if strategy_name == "sma_cross":
-        from crypto_backtester.strategies.sma_cross import generate_signals
-        params = {"short": strategy_params.get("short", 20),
-                  "long":  strategy_params.get("long", 60)}
-    elif strategy_name == "sma_macd_atr":
-        from crypto_backtester.strategies.sma_macd_atr import generate_signals
-        params = {
-            "sma_short": strategy_params.get("sma_short", 20),
-            "sma_long":  strategy_params.get("sma_long", 60),
-            "macd_fast": strategy_params.get("macd_fast", 12),
-            "macd_slow": strategy_params.get("macd_slow", 26),
-            "macd_signal": strategy_params.get("macd_signal", 9),
-            "atr_n":     strategy_params.get("atr_n", 14),
-            "atr_k":     strategy_params.get("atr_k", 3.0),
-        }
-    else:
-        raise ValueError(f"unknown strategy={strategy_name}")
-
-    sig = generate_signals(df, **params).reindex(df.index).fillna(0).astype(int)
-
-    # 실행 엔진 (on-close, long-only, all-in)
+def _simulate(df: pd.DataFrame, sig: pd.Series, symbol: str, res: str,
+              start_cash: float, fee_bps: float, slip_bps: float,
+              liquidate_on_end: bool = True) -> Tuple[pd.Series, List[Dict[str, Any]]]:
+    """실행 엔진 (on-close, long-only, all-in). (equity 시계열, 주문 목록) 반환."""
     slip = slip_bps / 10_000.0
     fee  = fee_bps  / 10_000.0
 
@@ -156,88 +120,164 @@ def run_backtest(
             equity_pairs[-1] = (last_ts.to_pydatetime(), cash)  # 마지막 시점 에쿼티 갱신
 
     equity_df = pd.Series({ts: val for ts, val in equity_pairs}, name="equity").sort_index()
-    m = _metrics(equity_df, res)
-    trades = sum(1 for o in orders if o["side"] == "SELL")  # '완결된 거래'로 카운트
-
-    # run_id, 요약/로그 저장
-    run_id = _gen_run_id()
-    start_s, end_s = pd.to_datetime(start).date().isoformat(), pd.to_datetime(end).date().isoformat()
-    line = _one_line(run_id, symbol, res, strategy_name, m["pnl"], m["sharpe"], m["mdd"], trades,
-                     fee_bps, slip_bps, start_s, end_s)
-    print(line)
-
-    # --- 산출물 저장 위치 결정(항상 experiments 계층) ---
-    if artifact_root is None:
-        exp_name = os.environ.get("ES_EXP_NAME", "UNNAMED-EXP")
-        base = Path(__file__).resolve().parents[1] / "experiments" / exp_name
-    else:
-        base = Path(artifact_root).resolve()
-    run_dir = base / "runs" / run_id
-    fig_dir = run_dir / "figures"
-    run_dir.mkdir(parents=True, exist_ok=True)
-    fig_dir.mkdir(parents=True, exist_ok=True)
-    equity_path = str(run_dir / "equity.csv")
-    orders_path = str(run_dir / "orders.csv")
-
-    # CSV 저장
-    equity_df.to_csv(equity_path, header=True)
-    for o in orders: o["run_id"] = run_id
-    pd.DataFrame(orders).to_csv(orders_path, index=False)
-
-    # summary 저장
-    summary_obj = {
-        "run_id": run_id, "symbol": symbol, "res": res, "strategy": strategy_name,
-        "pnl": float(m["pnl"]), "sharpe": float(m["sharpe"]), "mdd": float(m["mdd"]), "trades": int(trades),
-        "fee_bps": float(fee_bps), "slip_bps": float(slip_bps), "start": start_s, "end": end_s,
-        "start_cash": float(start_cash),
-        "params": strategy_params
-    }
-    with open(str(run_dir / "summary.json"), "w", encoding="utf-8") as f:
-        json.dump(summary_obj, f, ensure_ascii=False, indent=2)
-
-    # params.yaml 저장(없으면 params.json으로 폴백)
-    params_payload = {
-        "symbol": symbol, "resolution": res, "start": start_s, "end": end_s,
-        "strategy": strategy_name, "start_cash": float(start_cash),
-        "fee_bps": float(fee_bps), "slip_bps": float(slip_bps),
-        "params": strategy_params,
-    }
-    if yaml is not None:
-        with open(str(run_dir / "params.yaml"), "w", encoding="utf-8") as f:
-            yaml.safe_dump(params_payload, f, allow_unicode=True, sort_keys=False)
-    else:
-        with open(str(run_dir / "params.json"), "w", encoding="utf-8") as f:
-            json.dump(params_payload, f, ensure_ascii=False, indent=2)
-
-    # 그림 저장
-    if save_fig:
-        # equity
-        plt.figure(figsize=(10, 4))
-        equity_df.plot(ax=plt.gca())
-        plt.title(f"Equity — {symbol} {res} {strategy_name}")
-        plt.tight_layout()
-        if artifact_root:
-            plt.savefig(str(fig_dir / "equity.png"))
+    return equity_df, orders
+
+# --------- 공개 API ---------
+def run_backtest(
+    symbol: str, res: str, start: str, end: str,
+    strategy_name: str, strategy_params: Dict[str, Any],
+    start_cash: float, fee_bps: float, slip_bps: float,
+    liquidate_on_end: bool = True, db_logging: bool = True,
+    artifact_root: str | None = None,   # 실험 산출물 루트(exp-dir). None이면 experiments/<ES_EXP_NAME>/runs/<run_id> 사용
+    save_fig: bool = True,
+    use_signal_cache: bool = True,      # conf signal_cache.enabled와 함께 켜져 있어야 캐시 사용
+    cost_grid: Dict[str, List[float]] | None = None,  # {"fee_bps": [...], "slip_bps": [...]} → 비용 민감도 표면
+    artifact_format: str = "csv"        # "csv"(개별 파일) | "npz"(run.npz 단일 컬럼형 파일)
+) -> Dict[str, Any]:
+    """
+    실행 결과 산출물 저장 정책(통일):
+      - artifact_root 지정: <artifact_root>/runs/<run_id>/
+      - artifact_root 미지정: crypto_backtester/experiments/<ES_EXP_NAME 또는 UNNAMED-EXP>/runs/<run_id>/
+      - 저장물: equity.csv, orders.csv, summary.json, params.yaml, figures/{equity.png, drawdown.png}
+      - artifact_format="npz": equity/orders/summary 대신 run.npz 1개(+ figures)
+      - cost_grid 지정 시: cost_surface.csv, figures/cost_surface.png (거래 목록 1회 기록 → 그리드 일괄 평가)
+    """
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"unknown artifact_format={artifact_format} (allowed: {list(ARTIFACT_FORMATS)})")
+
+    # 리소스 예산: 청크 크기 결정 + RSS 샘플링(결정/실측은 summary["resources"])
+    conf = load_conf()
+    gov = ResourceGovernor.from_conf(conf)
+    gov.start_sampling()
+
+    try:
+        # 데이터 로드
+        eng = get_engine()
+        aid = ensure_asset(eng, symbol, market="crypto")
+        df = fetch_bars(eng, aid, res, start, end, market="crypto",
+                        chunk_rows=gov.fetch_chunk_rows(estimate_bars(res, start, end)))
+        if df.empty:
+            raise RuntimeError("no data")
+
+        # 전략 로드(레지스트리) + 시그널(캐시 적중 시 재계산 생략)
+        cache = SignalCache.from_conf(conf) if use_signal_cache else None
+        sig = compute_signals(df, strategy_name, strategy_params, cache=cache)
+
+        # 실행 엔진 (on-close, long-only, all-in)
+        equity_df, orders = _simulate(df, sig, symbol, res, start_cash, fee_bps, slip_bps, liquidate_on_end)
+        m = _metrics(equity_df, res)
+        trades = sum(1 for o in orders if o["side"] == "SELL")  # '완결된 거래'로 카운트
+
+        # run_id, 요약/로그 저장
+        run_id = _gen_run_id()
+        start_s, end_s = pd.to_datetime(start).date().isoformat(), pd.to_datetime(end).date().isoformat()
+        line = _one_line(run_id, symbol, res, strategy_name, m["pnl"], m["sharpe"], m["mdd"], trades,
+                         fee_bps, slip_bps, start_s, end_s)
+        print(line)
+
+        # --- 산출물 저장 위치 결정(항상 experiments 계층) ---
+        if artifact_root is None:
+            exp_name = os.environ.get("ES_EXP_NAME", "UNNAMED-EXP")
+            base = Path(__file__).resolve().parents[1] / "experiments" / exp_name
+        else:
+            base = Path(artifact_root).resolve()
+        run_dir = base / "runs" / run_id
+        fig_dir = run_dir / "figures"
+        run_dir.mkdir(parents=True, exist_ok=True)
+        fig_dir.mkdir(parents=True, exist_ok=True)
+        for o in orders: o["run_id"] = run_id
+
+        summary_obj = {
+            "run_id": run_id, "symbol": symbol, "res": res, "strategy": strategy_name,
+            "pnl": float(m["pnl"]), "sharpe": float(m["sharpe"]), "mdd": float(m["mdd"]), "trades": int(trades),
+            "fee_bps": float(fee_bps), "slip_bps": float(slip_bps), "start": start_s, "end": end_s,
+            "start_cash": float(start_cash),
+            "params": strategy_params
+        }
+
+        # 비용 민감도: 거래 순서는 비용과 무관 → 거래 목록 1회 기록 후 fee×slip 그리드를 벡터 연산으로
+        surface = None
+        if cost_grid:
+            trades_rec = extract_trades(df["close"], sig, liquidate_on_end)
+            surface = cost_surface(trades_rec, cost_grid["fee_bps"], cost_grid["slip_bps"],
+                                   start_cash, _periods_per_year(res))
+            surface_frame(surface).to_csv(str(run_dir / "cost_surface.csv"), index=False)
+            summary_obj["cost_surface"] = "cost_surface.csv"
+
+        if artifact_format == "npz":
+            # 단일 파일(컬럼형, 압축): equity/orders/summary(params 포함) → run.npz (summary가 들어가므로 맨 마지막에 기록)
+            summary_obj["artifact_format"] = "npz"
+            equity_path = orders_path = str(run_dir / RUN_FILE)
         else:
-            plt.savefig(str(fig_dir / f"{run_id}_equity.png"))
-        plt.close()
-
-        # drawdown
-        dd = equity_df / equity_df.cummax() - 1.0
-        plt.figure(figsize=(10, 3))
-        dd.plot(ax=plt.gca())
-        plt.title("Drawdown")
-        plt.tight_layout()
-        if artifact_root:
-            plt.savefig(str(fig_dir / "drawdown.png"))
+            equity_path = str(run_dir / "equity.csv")
+            orders_path = str(run_dir / "orders.csv")
+
+            # CSV 저장
+            equity_df.to_csv(equity_path, header=True)
+            pd.DataFrame(orders).to_csv(orders_path, index=False)
+
+            # params.yaml 저장(없으면 params.json으로 폴백)
+            params_payload = {
+                "symbol": symbol, "resolution": res, "start": start_s, "end": end_s,
+                "strategy": strategy_name, "start_cash": float(start_cash),
+                "fee_bps": float(fee_bps), "slip_bps": float(slip_bps),
+                "params": strategy_params,
+            }
+            if yaml is not None:
+                with open(str(run_dir / "params.yaml"), "w", encoding="utf-8") as f:
+                    yaml.safe_dump(params_payload, f, allow_unicode=True, sort_keys=False)
+            else:
+                with open(str(run_dir / "params.json"), "w", encoding="utf-8") as f:
+                    json.dump(params_payload, f, ensure_ascii=False, indent=2)
+
+        # 그림 저장
+        if save_fig:
+            # equity
+            plt.figure(figsize=(10, 4))
+            equity_df.plot(ax=plt.gca())
+            plt.title(f"Equity — {symbol} {res} {strategy_name}")
+            plt.tight_layout()
+            if artifact_root:
+                plt.savefig(str(fig_dir / "equity.png"))
+            else:
+                plt.savefig(str(fig_dir / f"{run_id}_equity.png"))
+            plt.close()
+
+            # drawdown
+            dd = equity_df / equity_df.cummax() - 1.0
+            plt.figure(figsize=(10, 3))
+            dd.plot(ax=plt.gca())
+            plt.title("Drawdown")
+            plt.tight_layout()
+            if artifact_root:
+                plt.savefig(str(fig_dir / "drawdown.png"))
+            else:
+                plt.savefig(str(fig_dir / f"{run_id}_drawdown.png"))
+            plt.close()
+
+            # cost surface
+            if surface is not None:
+                name = "cost_surface.png" if artifact_root else f"{run_id}_cost_surface.png"
+                plot_cost_surface(surface, str(fig_dir / name), base_fee=fee_bps, base_slip=slip_bps,
+                                  title=f"Cost sensitivity — {symbol} {res} {strategy_name} (trades={trades})")
+
+        # 리소스 보고: 그림/비용 표면 렌더링까지 포함한 RSS를 남기도록 summary 기록 직전에
+        resources = gov.report()
+        resources["bars"] = len(df)
+        summary_obj["resources"] = resources
+
+        if artifact_format == "npz":
+            write_run_artifact(run_dir, equity_df, orders, summary_obj)
         else:
-            plt.savefig(str(fig_dir / f"{run_id}_drawdown.png"))
-        plt.close()
-
-    return {
-        "run_id": run_id,
-        "artifact_dir": str(run_dir),
-        "equity_path": equity_path,
-        "orders_path": orders_path,
-        "summary": summary_obj
-    }
+            with open(str(run_dir / "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary_obj, f, ensure_ascii=False, indent=2)
+
+        return {
+            "run_id": run_id,
+            "artifact_dir": str(run_dir),
+            "equity_path": equity_path,
+            "orders_path": orders_path,
+            "summary": summary_obj
+        }
+    finally:
+        gov.stop_sampling()            # 예외로 끝나도 RSS 샘플링 스레드를 남기지 않는다
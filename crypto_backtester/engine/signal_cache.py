@@ -0,0 +1,118 @@
+from __future__ import annotations
+import os, json, time, hashlib, tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import ROOT
+from crypto_backtester.strategies import get_strategy, resolve_params
+
+BAR_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# --------- 키(content address) ---------
+def bars_digest(df: pd.DataFrame) -> str:
+    """바 데이터 내용 해시(ts + OHLCV 바이트). 같은 구간을 다시 읽어도 값이 같으면 같은 해시."""
+    h = hashlib.sha256()
+    h.update(pd.DatetimeIndex(df.index).as_unit("ns").asi8.tobytes())
+    cols = [c for c in BAR_COLUMNS if c in df.columns]
+    h.update(",".join(cols).encode("utf-8"))
+    h.update(np.ascontiguousarray(df[cols].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+def signal_key(data_digest: str, strategy: str, params: Dict[str, Any], version: str = "") -> str:
+    payload = json.dumps({"data": data_digest, "strategy": strategy, "version": version, "params": params},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# --------- 디스크 캐시 ---------
+class SignalCache:
+    """
+    <root>/<key[:2]>/<key>.npy 에 int8 시그널 벡터를 저장한다.
+    조회 시 mtime을 갱신(LRU), put 후 크기(max_mb)/나이(max_age_days) 기준으로 오래된 것부터 정리.
+    """
+
+    def __init__(self, root: str | Path, max_mb: float = 512, max_age_days: float = 30):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = float(max_age_days) * 86400
+
+    @classmethod
+    def from_conf(cls, conf: Dict[str, Any]) -> Optional["SignalCache"]:
+        c = conf.get("signal_cache", {}) or {}
+        if not c.get("enabled", False):
+            return None
+        root = Path(c.get("dir", ".cache/signals"))
+        if not root.is_absolute():
+            root = Path(ROOT) / root
+        return cls(root, max_mb=c.get("max_mb", 512), max_age_days=c.get("max_age_days", 30))
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        fp = self._path(key)
+        try:
+            arr = np.load(fp)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(fp)
+        except OSError:
+            pass
+        return arr
+
+    def put(self, key: str, sig: np.ndarray) -> None:
+        fp = self._path(key)
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        # 원자적 교체: 동시 실행 중인 다른 job이 반쯤 쓴 파일을 읽지 않도록
+        fd, tmp = tempfile.mkstemp(dir=fp.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(sig, dtype=np.int8))
+        os.replace(tmp, fp)
+        self.evict()
+
+    def evict(self) -> int:
+        """나이 초과 → 삭제, 이후 총 크기가 한도를 넘으면 가장 오래 안 쓴 것부터 삭제. 삭제 수 반환."""
+        if not self.root.exists():
+            return 0
+        now = time.time()
+        entries = []
+        for fp in self.root.glob("*/*.npy"):
+            try:
+                st = fp.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fp))
+        removed = 0
+        total = sum(e[1] for e in entries)
+        for mtime, size, fp in sorted(entries, key=lambda e: e[0]):
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                fp.unlink()
+                removed += 1
+                total -= size
+            except FileNotFoundError:
+                pass
+        return removed
+
+# --------- 공개 API ---------
+def compute_signals(df: pd.DataFrame, strategy: str, params: Optional[Dict[str, Any]] = None,
+                    cache: Optional[SignalCache] = None) -> pd.Series:
+    """
+    레지스트리의 전략으로 0/1 시그널을 만든다. cache가 있으면 (바 내용, 전략·버전, 파라미터) 해시로 재사용 —
+    수수료/슬리피지만 바꾼 재실행은 시그널 계산을 건너뛴다.
+    """
+    spec = get_strategy(strategy)
+    params = resolve_params(strategy, params)
+    key = None
+    if cache is not None:
+        key = signal_key(bars_digest(df), strategy, params, spec.version)
+        hit = cache.get(key)
+        if hit is not None and len(hit) == len(df):
+            return pd.Series(hit.astype(int), index=df.index)
+    sig = spec.fn(df, **params).reindex(df.index).fillna(0).astype(int)
+    if cache is not None:
+        cache.put(key, sig.to_numpy())
+    return sig
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import argparse
+import pandas as pd
+from sqlalchemy import text
+
+from crypto_backtester.engine.db_utils import DB_NAME, get_engine, ensure_asset
+from crypto_backtester.engine.adjustments import upsert_corp_actions, apply_adjustments, rebuild_adjustments
+
+def _equity_assets(eng):
+    with eng.begin() as conn:
+        rows = conn.execute(text(f"SELECT asset_id, symbol FROM `{DB_NAME}`.asset WHERE market='equity' ORDER BY symbol")).fetchall()
+    return [(int(r[0]), r[1]) for r in rows]
+
+def main():
+    ap = argparse.ArgumentParser(description="Load corporate actions and materialize equity_bars adj_factor/adj_close.")
+    ap.add_argument("--symbols", default=None, help="쉼표 구분. 생략 시 market=equity 전체")
+    ap.add_argument("--actions-csv", default=None, help="symbol,ex_date,kind(split|dividend),ratio,amount")
+    ap.add_argument("--provider", default=None)
+    ap.add_argument("--rebuild", action="store_true", help="증분 대신 전체 재계산")
+    args = ap.parse_args()
+
+    eng = get_engine()
+    if args.actions_csv:
+        acts = pd.read_csv(args.actions_csv)
+        for symbol, g in acts.groupby("symbol"):
+            aid = ensure_asset(eng, symbol, market="equity")
+            n = upsert_corp_actions(eng, aid, g, provider=args.provider)
+            print(f"[adjust] {symbol}: upserted {n} corp actions")
+
+    if args.symbols:
+        assets = [(ensure_asset(eng, s.strip(), market="equity"), s.strip()) for s in args.symbols.split(",") if s.strip()]
+    else:
+        assets = _equity_assets(eng)
+    for aid, symbol in assets:
+        st = rebuild_adjustments(eng, aid) if args.rebuild else apply_adjustments(eng, aid)
+        print(f"[adjust] {symbol}: {st}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import argparse, json, signal, threading
+
+from crypto_backtester.engine.db_utils import get_engine, ensure_asset
+from crypto_backtester.engine.bar_server import BarServer, server_conf, server_request, socket_path
+
+def parse_preload(s: str):
+    # "crypto:BTCUSDT:5m,crypto:ETHUSDT:1d" → [(market, symbol, res), ...]
+    out = []
+    for tok in (s or "").split(","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        parts = tok.split(":")
+        if len(parts) != 3:
+            raise SystemExit(f"bad --preload item: {tok} (market:symbol:res)")
+        out.append(tuple(parts))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Local shared-memory bar server (fetch_bars attaches when running).")
+    ap.add_argument("--socket", default=None, help="기본: ES_BAR_SOCKET 또는 conf bar_server.socket")
+    ap.add_argument("--budget-mb", type=float, default=None)
+    ap.add_argument("--ttl-sec", type=float, default=None, help="이 시간이 지난 시리즈는 다음 요청 때 DB에서 다시 적재")
+    ap.add_argument("--preload", default="", help="market:symbol:res,... 시작 시 미리 적재")
+    ap.add_argument("--stats", action="store_true", help="실행 중인 서버 상태 출력 후 종료")
+    ap.add_argument("--evict-all", action="store_true", help="실행 중인 서버의 캐시 비우기 후 종료")
+    args = ap.parse_args()
+
+    conf = server_conf()
+    sock = args.socket or socket_path()
+    if not sock:
+        raise SystemExit("bar_server disabled in conf/base.yaml (set ES_BAR_SOCKET or --socket)")
+
+    if args.stats or args.evict_all:
+        resp = server_request("evict" if args.evict_all else "stats", sock=sock)
+        if resp is None:
+            raise SystemExit(f"no bar server on {sock}")
+        print(json.dumps(resp, indent=2))
+        return
+
+    srv = BarServer(sock,
+                    budget_mb=args.budget_mb if args.budget_mb is not None else conf["budget_mb"],
+                    ttl_sec=args.ttl_sec if args.ttl_sec is not None else conf["ttl_sec"])
+    items = parse_preload(args.preload)
+    if items:
+        eng = get_engine()
+        for market, symbol, res in items:
+            aid = ensure_asset(eng, symbol, market=market)
+            info = srv.get((aid, res, market))
+            print(f"[bar_server] preload {market}:{symbol}:{res} -> {info}")
+
+    # SIGTERM/SIGINT → 정상 종료(세그먼트 unlink, 소켓 파일 삭제)
+    def _stop(*_):
+        threading.Thread(target=srv.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    print(f"[bar_server] listening on {sock} budget={srv.budget / 2**20:.0f}MB ttl={srv.ttl:.0f}s")
+    srv.serve_forever()
+    print("[bar_server] stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse, time, tracemalloc
+from typing import Callable, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import (
+    FETCH_CHUNK_ROWS, _fetch_bars_fetchall, _fill_bars, _frame_from_rows,
+    _fetch_bars_db, ensure_asset, get_engine,
+)
+
+def _measure(fn: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, float, int]:
+    # 시간과 peak 메모리는 따로 잰다(tracemalloc 자체가 할당마다 오버헤드를 더함)
+    t0 = time.perf_counter()
+    df = fn()
+    dt = time.perf_counter() - t0
+    del df
+    tracemalloc.start()
+    df = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, dt, peak
+
+# --------- 합성 모드(DB 없이 행 → DataFrame 변환만 비교) ---------
+def _synthetic_rows(n: int, epoch: bool, chunk: int) -> Iterator[List[tuple]]:
+    # 드라이버가 넘겨주는 것과 같은 파이썬 객체(튜플/ datetime 또는 int/float)를 청크 단위로 만든다
+    rng = np.random.default_rng(42)
+    t0 = pd.Timestamp("2021-01-01").to_pydatetime()
+    base = int(pd.Timestamp("2021-01-01", tz="UTC").timestamp())
+    step = pd.Timedelta("5min").to_pytimedelta()
+    for lo in range(0, n, chunk):
+        m = min(chunk, n - lo)
+        v = (60_000 + rng.normal(0, 100, (m, 5))).tolist()
+        if epoch:
+            yield [(base + 300 * (lo + i), *v[i]) for i in range(m)]
+        else:
+            yield [(t0 + step * (lo + i), *v[i]) for i in range(m)]
+
+def _run_synthetic(n: int, chunk: int):
+    # 행 생성 비용이 측정에 섞이지 않게 미리 만든다. 스트리밍 쪽 peak에는 이 원본이 잡히지 않으므로
+    # 공정하게 fetchall 쪽도 "리스트로 모으는" 단계부터만 잰다(원본 청크는 두 경로가 공유).
+    dt_chunks = list(_synthetic_rows(n, False, chunk))
+    ep_chunks = list(_synthetic_rows(n, True, chunk))
+
+    def legacy():
+        rows = [r for c in dt_chunks for r in c]                          # fetchall 에뮬레이션
+        return _frame_from_rows(rows)
+
+    def streaming():
+        return _fill_bars(iter(ep_chunks), n_hint=n)
+    return legacy, streaming
+
+def _run_db(symbol: str, res: str, start: str, end: str, market: str, chunk: int):
+    eng = get_engine()
+    aid = ensure_asset(eng, symbol, market=market)
+    return (lambda: _fetch_bars_fetchall(eng, aid, res, start, end, market=market),
+            lambda: _fetch_bars_db(eng, aid, res, start, end, market=market, chunk_rows=chunk))
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark fetch_bars: fetchall vs streaming typed read (peak memory, rows/sec).")
+    ap.add_argument("--synthetic", type=int, default=None, help="DB 없이 N행 합성 데이터로 변환 경로만 비교")
+    ap.add_argument("--symbol", default="BTCUSDT")
+    ap.add_argument("--res", default="5m")
+    ap.add_argument("--start", default="2021-01-01")
+    ap.add_argument("--end", default="2025-01-01")
+    ap.add_argument("--market", default="crypto")
+    ap.add_argument("--chunk", type=int, default=FETCH_CHUNK_ROWS)
+    args = ap.parse_args()
+
+    if args.synthetic:
+        legacy, streaming = _run_synthetic(args.synthetic, args.chunk)
+        label = f"synthetic rows={args.synthetic}"
+    else:
+        legacy, streaming = _run_db(args.symbol, args.res, args.start, args.end, args.market, args.chunk)
+        label = f"{args.symbol} {args.res} [{args.start}, {args.end})"
+
+    # tracemalloc은 파이썬 할당(NumPy 버퍼 포함)을 추적한다
+    a, t_a, p_a = _measure(legacy)
+    b, t_b, p_b = _measure(streaming)
+    n = len(b)
+    same = (len(a) == n and np.array_equal(a.index.as_unit("ns").asi8, b.index.asi8)
+            and np.allclose(a.to_numpy(dtype=float), b.to_numpy(), equal_nan=True))
+    print(f"[bench] {label} chunk={args.chunk} match={same}")
+    print(f"        fetchall : {t_a:7.3f}s  {n / max(t_a, 1e-9):12,.0f} rows/s  peak={p_a / 2**20:8.1f} MiB")
+    print(f"        streaming: {t_b:7.3f}s  {n / max(t_b, 1e-9):12,.0f} rows/s  peak={p_b / 2**20:8.1f} MiB")
+    print(f"        result frame={b.memory_usage(index=True).sum() / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
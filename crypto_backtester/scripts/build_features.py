@@ -0,0 +1,34 @@
+from __future__ import annotations
+import argparse, json
+from crypto_backtester.engine.db_utils import get_engine, ensure_asset, fetch_bars
+from crypto_backtester.engine.features import DEFAULT_SPEC, build_feature_store, spec_version
+
+def main():
+    ap = argparse.ArgumentParser(description="Build memory-mapped float32 feature stores for ML training.")
+    ap.add_argument("--symbols", default="BTCUSDT", help="콤마 구분")
+    ap.add_argument("--market", choices=["crypto","equity","commodity","fx"], default="crypto")
+    ap.add_argument("--res", choices=["5m","1d"], default="5m")
+    ap.add_argument("--start", required=True)
+    ap.add_argument("--end",   required=True, help="end exclusive")
+    ap.add_argument("--spec", default=None, help="피처 spec JSON 파일(기본: DEFAULT_SPEC)")
+    ap.add_argument("--out-root", default="crypto_backtester/datasets/features")
+    ap.add_argument("--overwrite", action="store_true")
+    args = ap.parse_args()
+
+    spec = DEFAULT_SPEC
+    if args.spec:
+        with open(args.spec, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+
+    eng = get_engine()
+    for symbol in [s.strip() for s in args.symbols.split(",") if s.strip()]:
+        aid = ensure_asset(eng, symbol, market=args.market)
+        df = fetch_bars(eng, aid, args.res, args.start, args.end, market=args.market)
+        if df.empty:
+            print(f"[features] {symbol}: no data, skipped")
+            continue
+        out = build_feature_store(df, args.out_root, symbol, args.res, spec, overwrite=args.overwrite)
+        print(f"[features] {symbol} {args.res} rows={len(df)} version={spec_version(spec)} → {out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 from __future__ import annotations
-import argparse, time
-from typing import Iterator, Tuple
+import argparse, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 
-from crypto_backtester.engine.db_utils import get_engine, ensure_asset, upsert_bars
+from crypto_backtester.engine.db_utils import (
+    get_engine, ensure_asset, upsert_bars,
+    get_ingest_status, upsert_bars_with_status, mark_ingest_status, max_bar_ts,
+)
+from crypto_backtester.engine.resources import ResourceGovernor
 
 BINANCE_BASE = "https://api.binance.com"  # Spot
 INTERVAL = "5m"
@@ -16,16 +22,21 @@ def to_ms(s: str) -> int:
     ts = pd.to_datetime(s, utc=True)
     return int(ts.value // 1_000_000)
 
-def fetch_klines(symbol: str, start_ms: int, end_ms: int, session: requests.Session, sleep: float = 0.2
-                  ) -> Iterator[pd.DataFrame]:
+def fetch_klines(symbol: str, start_ms: int, end_ms: int, session: requests.Session, sleep: float = 0.2,
+                 base_url: str = BINANCE_BASE, skip_empty_page: bool = False,
+                 max_requests: Optional[int] = None) -> Iterator[pd.DataFrame]:
     """
     Binance REST /api/v3/klines 페이징 제너레이터.
     - start_ms <= openTime < end_ms (end exclusive)
     - 한 번에 최대 1000개(≈3.47일)씩 가져오고 커밋
+    - skip_empty_page: 빈 응답이면 해당 페이지 구간 전체를 건너뜀(거래 정지/상장 전 심볼에 바 단위 재요청 방지)
+    - max_requests: 빈 페이지 포함 최대 요청 수(None이면 무제한)
     """
-    url = f"{BINANCE_BASE}/api/v3/klines"
+    url = f"{base_url}/api/v3/klines"
     cursor = start_ms
-    while cursor < end_ms:
+    requests_made = 0
+    while cursor < end_ms and (max_requests is None or requests_made < max_requests):
+        requests_made += 1
         # 이번 페이지에서 가능한 최대 구간(끝을 살짝 당겨 과다포함 방지)
         page_end = min(end_ms - 1, cursor + LIMIT * STEP_MS - 1)
         params = dict(symbol=symbol.upper(), interval=INTERVAL,
@@ -35,8 +46,8 @@ def fetch_klines(symbol: str, start_ms: int, end_ms: int, session: requests.Sess
             raise RuntimeError(f"Binance HTTP {r.status_code}: {r.text}")
         data = r.json()
         if not data:
-            # 비정상 공백 회피: 다음 바로 전진
-            cursor += STEP_MS
+            # 빈 구간: skip_empty_page면 페이지 끝 다음으로, 아니면 다음 바로 전진
+            cursor = page_end + 1 if skip_empty_page else cursor + STEP_MS
             time.sleep(sleep)
             continue
         # klines 포맷 참조: [openTime, open, high, low, close, volume, closeTime, ...]
@@ -53,15 +64,145 @@ def fetch_klines(symbol: str, start_ms: int, end_ms: int, session: requests.Sess
         cursor = last_open + STEP_MS
         time.sleep(sleep)  # 레이트리밋 완충(가벼운 백오프)
 
+# --------- tail 모드(ingest_status 워터마크 기반 연속 수집) ---------
+def closed_end_ms(now_ms: int) -> int:
+    """마감된 캔들만 받도록 openTime 상한(exclusive)을 5분 경계로 내림."""
+    return (now_ms // STEP_MS) * STEP_MS
+
+def make_session(pool: int = 10) -> requests.Session:
+    """keep-alive 커넥션 풀을 쓰는 세션(심볼 간 재사용)."""
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+def collect_closed(symbol: str, cursor_ms: int, now_ms: int, session: requests.Session,
+                   base_url: str = BINANCE_BASE, max_pages: int = 10, sleep: float = 0.2) -> pd.DataFrame:
+    """
+    cursor_ms 이후 마감된 5m 캔들을 최대 max_pages 페이지까지 모아 하나로 반환(배치 업서트용).
+    빈 페이지는 구간 단위로 건너뛰고(빈 페이지도 max_pages에 포함) 요청 사이 sleep초를 쉰다
+    (워커×심볼 수만큼 레이트리밋을 나눠 씀).
+    """
+    end_ms = closed_end_ms(now_ms)
+    if cursor_ms >= end_ms:
+        return pd.DataFrame(columns=["open","high","low","close","volume"])
+    pages = []
+    for df in fetch_klines(symbol, cursor_ms, end_ms, session, sleep=sleep, base_url=base_url,
+                           skip_empty_page=True, max_requests=max_pages):
+        pages.append(df)
+        if len(pages) >= max_pages:
+            break
+    if not pages:
+        return pd.DataFrame(columns=["open","high","low","close","volume"])
+    out = pd.concat(pages)
+    return out[~out.index.duplicated(keep="last")].sort_index()
+
+def _resume_ms(eng, asset_id: int, bootstrap_ms: int) -> int:
+    """재개 지점: ingest_status 워터마크 → (없으면) 바 테이블 MAX(ts) → (그것도 없으면) bootstrap_ms."""
+    st = get_ingest_status(eng, asset_id, INTERVAL)
+    last = st["last_ts"] if st and st["last_ts"] is not None else max_bar_ts(eng, asset_id, INTERVAL)
+    if last is not None:
+        return int(pd.Timestamp(last, tz="UTC").value // 1_000_000) + STEP_MS
+    return bootstrap_ms
+
+def tail_symbol(eng, asset_id: int, symbol: str, session: requests.Session, now_ms: int,
+                bootstrap_ms: int, base_url: str = BINANCE_BASE, max_pages: int = 10,
+                sleep: float = 0.2) -> Tuple[int, Optional[pd.Timestamp]]:
+    """심볼 1개: 워터마크부터 마감 캔들 수집 → 업서트+워터마크를 원자적으로 커밋. (rows, last_ts) 반환."""
+    cursor = _resume_ms(eng, asset_id, bootstrap_ms)
+    df = collect_closed(symbol, cursor, now_ms, session, base_url=base_url, max_pages=max_pages, sleep=sleep)
+    if df.empty:
+        mark_ingest_status(eng, asset_id, INTERVAL, "ok", "no new closed candles")
+        return 0, None
+    n = upsert_bars_with_status(eng, asset_id, INTERVAL, df, market="crypto",
+                                msg=f"tail rows={len(df)}")
+    return n, df.index[-1]
+
+def run_tail(symbols: List[str], bootstrap_ms: int, base_url: str = BINANCE_BASE,
+             workers: int | None = None, delay: float = 2.0, max_pages: int = 10, once: bool = False,
+             sleep: float = 0.2) -> None:
+    """
+    5분 경계 + delay초마다 모든 심볼의 마감 캔들을 수집한다.
+    - 심볼별로 ingest_status.last_ts(없으면 이미 적재된 바의 MAX(ts)) 다음 바부터 재개
+    - 워커 스레드마다 keep-alive 세션 1개를 심볼 간 재사용
+    - 한 사이클이 다음 경계 전에 끝나면 신선도 지연은 1바 미만
+    - workers 지정 시 그대로(심볼 수 이내), 생략 시 resources 예산(심볼당 max_pages×1000행 버퍼)과 CPU로 결정
+    """
+    gov = ResourceGovernor.from_conf()
+    workers = min(len(symbols) or 1, gov.workers("ingest", bars_per_job=max_pages * 1000,
+                                                 requested=workers, io_bound=True))
+    print(f"[tail] workers={workers} ({gov.decisions[-1]})")
+    eng = get_engine()
+    asset_ids = {sym: ensure_asset(eng, sym) for sym in symbols}
+    local = threading.local()
+
+    def _session() -> requests.Session:
+        if not hasattr(local, "sess"):
+            local.sess = make_session()
+        return local.sess
+
+    def _one(sym: str, now_ms: int):
+        aid = asset_ids[sym]
+        try:
+            n, last_ts = tail_symbol(eng, aid, sym, _session(), now_ms, bootstrap_ms,
+                                     base_url=base_url, max_pages=max_pages, sleep=sleep)
+            return sym, n, last_ts, None
+        except Exception as e:  # 한 심볼 실패가 루프 전체를 멈추지 않도록
+            try:
+                mark_ingest_status(eng, aid, INTERVAL, "error", f"{type(e).__name__}: {e}")
+            except Exception:
+                pass
+            return sym, 0, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            now_ms = int(time.time() * 1000)
+            t0 = time.time()
+            results = list(pool.map(lambda s: _one(s, now_ms), symbols))
+            total = sum(r[1] for r in results)
+            errors = [(r[0], r[3]) for r in results if r[3] is not None]
+            lags = [now_ms / 1000 - (r[2].value / 1e9 + STEP_MS / 1000) for r in results if r[2] is not None]
+            lag_s = f"{max(lags):.1f}s" if lags else "-"
+            print(f"[tail] {pd.Timestamp(now_ms, unit='ms', tz='UTC').isoformat()} symbols={len(symbols)} "
+                  f"rows={total} errors={len(errors)} max_lag={lag_s} took={time.time() - t0:.1f}s")
+            for sym, e in errors:
+                print(f"       ! {sym}: {type(e).__name__}: {e}")
+            if once:
+                return
+            # 다음 5분 경계 + delay까지 대기
+            next_ms = closed_end_ms(int(time.time() * 1000)) + STEP_MS + int(delay * 1000)
+            time.sleep(max(0.0, next_ms / 1000 - time.time()))
+
 def main():
-    ap = argparse.ArgumentParser(description="Fetch 5m klines from Binance and upsert into MariaDB bars(res='5m').")
+    ap = argparse.ArgumentParser(description="Fetch 5m klines from Binance and upsert into MariaDB bars(res='5m'). "
+                                             "--tail: continuous mode driven by ingest_status watermarks.")
     ap.add_argument("--symbol", default="BTCUSDT", help="e.g., BTCUSDT (Spot)")
-    ap.add_argument("--start", required=True, help="UTC start (YYYY-MM-DD or ISO8601)")
-    ap.add_argument("--end",   required=True, help="UTC end (exclusive; YYYY-MM-DD or ISO8601)")
+    ap.add_argument("--start", default=None, help="UTC start (YYYY-MM-DD or ISO8601); tail 모드에선 워터마크·기존 바가 모두 없을 때 시작점")
+    ap.add_argument("--end",   default=None, help="UTC end (exclusive; YYYY-MM-DD or ISO8601)")
     ap.add_argument("--sleep", type=float, default=0.2, help="seconds between requests")
     ap.add_argument("--csv-out", default="", help="(optional) also append to CSV as file-rail")
+    ap.add_argument("--base-url", default=BINANCE_BASE, help="klines REST base (테스트용 로컬 서버 가능)")
+
+    # tail 모드
+    ap.add_argument("--tail", action="store_true", help="ingest_status 워터마크부터 연속 수집(데몬)")
+    ap.add_argument("--symbols", default="", help="tail 대상 심볼 목록(콤마). 비우면 --symbol")
+    ap.add_argument("--workers", type=int, default=None, help="tail 동시 요청 수(스레드별 keep-alive 세션, 심볼 수 이내). 기본: 리소스 예산으로 결정")
+    ap.add_argument("--delay", type=float, default=2.0, help="5분 경계 후 대기(초) — 거래소 마감 반영 여유")
+    ap.add_argument("--max-pages", type=int, default=10, help="심볼당 1회 커밋에 모을 최대 페이지 수")
+    ap.add_argument("--once", action="store_true", help="tail 1사이클만 실행(cron/테스트)")
     args = ap.parse_args()
 
+    if args.tail:
+        symbols = [s.strip().upper() for s in (args.symbols or args.symbol).split(",") if s.strip()]
+        bootstrap = args.start or (pd.Timestamp.now(tz="UTC") - pd.Timedelta("1D")).isoformat()
+        run_tail(symbols, to_ms(bootstrap), base_url=args.base_url, workers=args.workers,
+                 delay=args.delay, max_pages=args.max_pages, once=args.once, sleep=args.sleep)
+        return
+
+    if not args.start or not args.end:
+        raise SystemExit("--start and --end are required (or use --tail)")
+
     start_ms, end_ms = to_ms(args.start), to_ms(args.end)
     if end_ms <= start_ms:
         raise SystemExit("end must be greater than start (end is exclusive)")
@@ -71,7 +212,7 @@ def main():
 
     total_rows, pages = 0, 0
     with requests.Session() as sess:
-        for df in fetch_klines(args.symbol, start_ms, end_ms, sess, sleep=args.sleep):
+        for df in fetch_klines(args.symbol, start_ms, end_ms, sess, sleep=args.sleep, base_url=args.base_url):
             if df.empty:
                 continue
             # 멱등 업서트
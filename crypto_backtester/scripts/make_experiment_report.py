@@ -1,8 +1,13 @@
 # crypto_backtester/scripts/make_experiment_report.py
 from __future__ import annotations
-import argparse, json, csv, shutil
+import argparse, json, csv, shutil, os, hashlib, fcntl, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Tuple
+
+from crypto_backtester.engine.artifacts import RUN_FILE, read_summary
+from crypto_backtester.engine.resources import default_governor
 
 def _write(p: Path, s: str):
     p.parent.mkdir(parents=True, exist_ok=True)
@@ -10,9 +15,13 @@ def _write(p: Path, s: str):
 
 def _load_summary(from_dir: Path) -> Dict:
     fp = from_dir / "summary.json"
-    if not fp.exists():
-        raise SystemExit(f"not found: {fp}")
-    return json.loads(fp.read_text(encoding="utf-8"))
+    if fp.exists():
+        return json.loads(fp.read_text(encoding="utf-8"))
+    # 단일 파일 포맷(run.npz): summary 멤버만 읽는다
+    npz = from_dir / RUN_FILE
+    if npz.exists():
+        return read_summary(npz)
+    raise SystemExit(f"not found: {fp} (or {npz})")
 
 def _card_md(s: Dict, notes: str) -> str:
     params = s.get("params", {})
@@ -31,6 +40,14 @@ def _card_md(s: Dict, notes: str) -> str:
 """
 
 def _report_md(s: Dict, notes: str) -> str:
+    cost = ""
+    if s.get("cost_surface"):
+        cost = f"""
+## 3) 비용 민감도 (fee × slip)
+- 실행 비용(x): fee {s['fee_bps']:g}bps, slip {s['slip_bps']:g}bps / 그리드 값: `{s['cost_surface']}`
+
+![cost](./figures/cost_surface.png)
+"""
     return f"""# Report — {s['symbol']}({s['res']}) / {s['strategy']}
 
 ## 1) 결과 요약
@@ -39,21 +56,30 @@ def _report_md(s: Dict, notes: str) -> str:
 ## 2) 에쿼티 & 드로다운
 ![equity](./figures/equity.png)
 ![dd](./figures/drawdown.png)
-
-## 3) 메모
+{cost}
+## {4 if cost else 3}) 메모
 - {notes if notes else "-"}
 """
 
-def _links_json() -> str:
-    return json.dumps({
-        "local": {
+def _links_json(s: Dict | None = None) -> str:
+    if s and s.get("artifact_format") == "npz":
+        local = {
+            "run_npz": RUN_FILE,   # equity/orders/summary 단일 컬럼형 파일
+            "equity_png": "figures/equity.png",
+            "drawdown_png": "figures/drawdown.png"
+        }
+    else:
+        local = {
             "summary": "summary.json",
             "equity_csv": "equity.csv",
             "orders_csv": "orders.csv",
             "equity_png": "figures/equity.png",
             "drawdown_png": "figures/drawdown.png"
         }
-    }, ensure_ascii=False, indent=2)
+    if s and s.get("cost_surface"):
+        local["cost_surface_csv"] = "cost_surface.csv"
+        local["cost_surface_png"] = "figures/cost_surface.png"
+    return json.dumps({"local": local}, ensure_ascii=False, indent=2)
 
 def _params_yaml(s: Dict, notes: str) -> str:
     params = s.get("params", {}) or {}
@@ -79,42 +105,112 @@ def _params_yaml(s: Dict, notes: str) -> str:
     ]
     return "\n".join(lines) + "\n"
 
-def _append_runs_csv(exp_dir: Path, s: Dict):
+RUNS_CSV_HEADER = ["run_id","symbol","res","strategy","pnl","sharpe","mdd","trades","fee_bps","slip_bps","start","end"]
+
+# 리포트 템플릿이 바뀌면 올린다(입력 해시에 포함 → 전체 재생성)
+REPORT_VERSION = 1
+STATE_FILE = ".report.json"   # run 폴더별: 입력 해시 + notes
+
+ARTIFACT_MAPPING = {
+    "summary.json": "summary.json",
+    "equity.csv": "equity.csv",
+    "orders.csv": "orders.csv",
+    RUN_FILE: RUN_FILE,
+    "figures/equity.png": "figures/equity.png",
+    "figures/drawdown.png": "figures/drawdown.png",
+    "cost_surface.csv": "cost_surface.csv",
+    "figures/cost_surface.png": "figures/cost_surface.png",
+}
+
+@contextmanager
+def _runs_csv_lock(exp_dir: Path):
+    """runs.csv 읽기-수정-쓰기 구간 직렬화(여러 run_backtest --auto-report 프로세스 동시 실행 대비)."""
+    exp_dir.mkdir(parents=True, exist_ok=True)
+    with open(exp_dir / "runs.csv.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _write_runs_csv(exp_dir: Path, rows: List[Dict]):
+    """runs.csv를 run_id 기준 중복 제거(뒤의 값 우선) 후 한 번에 기록(임시파일 → 교체). _runs_csv_lock 안에서 호출."""
     out = exp_dir / "runs.csv"
-    hdr = ["run_id","symbol","res","strategy","pnl","sharpe","mdd","trades","fee_bps","slip_bps","start","end"]
-    write_header = not out.exists()
-    with out.open("a", newline="", encoding="utf-8") as f:
-        wr = csv.DictWriter(f, fieldnames=hdr)
-        if write_header: wr.writeheader()
-        wr.writerow({k: s.get(k) for k in hdr})
+    by_id: Dict[str, Dict] = {}
+    for r in rows:
+        by_id[str(r.get("run_id"))] = {k: r.get(k) for k in RUNS_CSV_HEADER}
+    fd, tmp = tempfile.mkstemp(dir=exp_dir, prefix="runs.csv.", suffix=".tmp")
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        wr = csv.DictWriter(f, fieldnames=RUNS_CSV_HEADER)
+        wr.writeheader()
+        for rid in sorted(by_id):
+            wr.writerow(by_id[rid])
+    os.replace(tmp, out)
+
+def _read_runs_csv(exp_dir: Path) -> List[Dict]:
+    fp = exp_dir / "runs.csv"
+    if not fp.exists():
+        return []
+    with fp.open("r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def _append_runs_csv(exp_dir: Path, s: Dict):
+    # 이미 있는 run_id면 행을 갱신(중복 추가 방지)
+    with _runs_csv_lock(exp_dir):
+        _write_runs_csv(exp_dir, _read_runs_csv(exp_dir) + [s])
+
+def _link_or_copy(src: Path, dst: Path):
+    """하드링크 우선(같은 파일시스템), 불가하면 copy2. 이미 같은 파일이면 건너뜀."""
+    if dst.exists():
+        if os.path.samefile(src, dst):
+            return
+        dst.unlink()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 def _sync_artifacts(from_dir: Path, run_dir: Path):
-    mapping = {
-        "summary.json": "summary.json",
-        "equity.csv": "equity.csv",
-        "orders.csv": "orders.csv",
-        "figures/equity.png": "figures/equity.png",
-        "figures/drawdown.png": "figures/drawdown.png",
-    }
-    for src_rel, dst_rel in mapping.items():
+    for src_rel, dst_rel in ARTIFACT_MAPPING.items():
         src = from_dir / src_rel
         dst = run_dir / dst_rel
-        if src.exists():
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            if src.resolve() != dst.resolve():
-                shutil.copy2(src, dst)
+        if src.exists() and src.resolve() != dst.resolve():
+            _link_or_copy(src, dst)
 
-def emit_from_local(from_dir: str, exp_dir: str, notes: str = "", no_params_file: bool = False) -> str:
-    """
-    runner가 artifact_root에 쓴 산출물(from_dir)을 실험 폴더(exp_dir)/runs/<run_id>/ 로 동기화하고,
-    card.md / report.md / links.json / (옵션) params.yaml을 생성한다.
-    """
-    from_p = Path(from_dir).resolve()
-    exp_p = Path(exp_dir).resolve()
+def _inputs_digest(from_dir: Path, notes: str, no_params_file: bool) -> str:
+    """리포트 입력(산출물 내용 + notes + 옵션 + 템플릿 버전)의 sha256."""
+    h = hashlib.sha256()
+    h.update(json.dumps({"v": REPORT_VERSION, "notes": notes, "no_params": no_params_file}).encode("utf-8"))
+    for rel in sorted(ARTIFACT_MAPPING):
+        fp = from_dir / rel
+        if not fp.exists():
+            continue
+        h.update(rel.encode("utf-8"))
+        with fp.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
 
+def _read_state(run_dir: Path) -> Dict:
+    fp = run_dir / STATE_FILE
+    try:
+        return json.loads(fp.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _emit_run(from_p: Path, exp_p: Path, notes: str | None, no_params_file: bool,
+              force: bool = False) -> Tuple[Dict, Path, bool]:
+    """run 1개 리포트 생성. notes=None이면 이전 notes 유지. (summary, run_dir, 새로 썼는지) 반환."""
     s = _load_summary(from_p)
-    run_id = s["run_id"]
-    run_dir = exp_p / "runs" / run_id
+    run_dir = exp_p / "runs" / s["run_id"]
+    state = _read_state(run_dir)
+    if notes is None:
+        notes = state.get("notes", "")
+    digest = _inputs_digest(from_p, notes, no_params_file)
+    outputs = ["card.md", "report.md", "links.json"] + ([] if no_params_file else ["params.yaml"])
+    if not force and state.get("digest") == digest and all((run_dir / o).exists() for o in outputs):
+        return s, run_dir, False
     run_dir.mkdir(parents=True, exist_ok=True)
 
     # 아티팩트 동기화
@@ -123,27 +219,82 @@ def emit_from_local(from_dir: str, exp_dir: str, notes: str = "", no_params_file
     # 리포트 파일 생성
     _write(run_dir / "card.md", _card_md(s, notes))
     _write(run_dir / "report.md", _report_md(s, notes))
-    _write(run_dir / "links.json", _links_json())
+    _write(run_dir / "links.json", _links_json(s))
     if not no_params_file:
         _write(run_dir / "params.yaml", _params_yaml(s, notes))
+    _write(run_dir / STATE_FILE, json.dumps({"digest": digest, "notes": notes}, ensure_ascii=False))
+    return s, run_dir, True
+
+def emit_from_local(from_dir: str, exp_dir: str, notes: str = "", no_params_file: bool = False,
+                    force: bool = False) -> str:
+    """
+    runner가 artifact_root에 쓴 산출물(from_dir)을 실험 폴더(exp_dir)/runs/<run_id>/ 로 동기화하고,
+    card.md / report.md / links.json / (옵션) params.yaml을 생성한다.
+    입력 해시가 이전과 같으면 다시 쓰지 않고, runs.csv는 run_id 기준으로 갱신(중복 없음).
+    """
+    exp_p = Path(exp_dir).resolve()
+    s, run_dir, _ = _emit_run(Path(from_dir).resolve(), exp_p, notes, no_params_file, force)
 
     # 실험 인덱스 누계
     _append_runs_csv(exp_p, s)
 
     return str(run_dir)
 
+def _run_dirs(root: Path) -> List[Path]:
+    runs = root / "runs"
+    if not runs.is_dir():
+        return []
+    return sorted(d for d in runs.iterdir()
+                  if d.is_dir() and ((d / "summary.json").exists() or (d / RUN_FILE).exists()))
+
+def emit_experiment(exp_dir: str, src_root: str | None = None, notes: str | None = None,
+                    no_params_file: bool = False, workers: int | None = None,
+                    force: bool = False) -> Dict[str, int]:
+    """
+    실험 폴더 전체 리포트를 병렬로 (재)생성한다.
+      - src_root: runner 산출물 루트(<src_root>/runs/<run_id>/). 기본은 exp_dir 자체(제자리 재생성)
+      - 입력 해시가 같은 run은 건너뜀, 산출물은 하드링크 우선
+      - runs.csv는 기존 행 + 이번 요약을 run_id 기준 중복 제거해 한 번에 기록
+    """
+    exp_p = Path(exp_dir).resolve()
+    src_p = Path(src_root).resolve() if src_root else exp_p
+    sources = _run_dirs(src_p)
+    # workers 지정 시 그대로, 생략 시 I/O 위주(파일 읽기/쓰기) → CPU×4까지, 리소스 예산 안에서
+    workers = min(max(len(sources), 1), default_governor().workers("report", requested=workers, io_bound=True))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda d: _emit_run(d, exp_p, notes, no_params_file, force), sources))
+
+    with _runs_csv_lock(exp_p):
+        rows = _read_runs_csv(exp_p) + [s for s, _, _ in results]
+        if rows:
+            _write_runs_csv(exp_p, rows)
+    written = sum(1 for _, _, w in results if w)
+    return {"runs": len(results), "written": written, "skipped": len(results) - written}
+
 # --- CLI ---
 def _parse_args():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--from-dir", required=True, help="runner가 쓴 산출물 디렉터리(= artifact_dir)")
+    ap.add_argument("--from-dir", default=None,
+                    help="runner가 쓴 산출물 디렉터리(= artifact_dir). --batch면 <from-dir>/runs/* 를 원본으로 사용")
     ap.add_argument("--exp-dir", required=True, help="실험 폴더(experiments/..)")
-    ap.add_argument("--notes", type=str, default="")
+    ap.add_argument("--notes", type=str, default=None, help="미지정 시 단일 run은 빈 값, --batch는 이전 notes 유지")
     ap.add_argument("--no-params-file", action="store_true")
+    ap.add_argument("--batch", action="store_true", help="실험 폴더 전체를 병렬·증분 재생성")
+    ap.add_argument("--workers", type=int, default=None, help="병렬 수(run 수 이내). 기본: 리소스 예산·CPU로 결정")
+    ap.add_argument("--force", action="store_true", help="입력 해시가 같아도 다시 생성")
     return ap.parse_args()
 
 def main():
     args = _parse_args()
-    out = emit_from_local(args.from_dir, args.exp_dir, args.notes, args.no_params_file)
+    if args.batch:
+        st = emit_experiment(args.exp_dir, args.from_dir, args.notes, args.no_params_file,
+                             workers=args.workers, force=args.force)
+        print(f"[make_experiment_report] batch runs={st['runs']} written={st['written']} "
+              f"skipped={st['skipped']} -> {args.exp_dir}")
+        return
+    if not args.from_dir:
+        raise SystemExit("--from-dir is required (or use --batch)")
+    out = emit_from_local(args.from_dir, args.exp_dir, args.notes or "", args.no_params_file, args.force)
     print(f"[make_experiment_report] wrote -> {out}")
 
 if __name__ == "__main__":
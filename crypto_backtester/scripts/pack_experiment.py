@@ -0,0 +1,19 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from crypto_backtester.engine.artifacts import pack_experiment, read_index
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack experiments/<exp>/runs/* (csv or npz) into one columnar runs.npz.")
+    ap.add_argument("--exp-dir", required=True, help="실험 폴더(experiments/..)")
+    ap.add_argument("--out", default=None, help="출력 경로(기본: <exp-dir>/runs.npz)")
+    ap.add_argument("--run-ids", default=None, help="콤마 구분 run_id만 포함")
+    args = ap.parse_args()
+
+    run_ids = [r.strip() for r in args.run_ids.split(",") if r.strip()] if args.run_ids else None
+    out = pack_experiment(args.exp_dir, out=args.out, run_ids=run_ids)
+    idx = read_index(out)
+    print(f"[pack_experiment] runs={len(idx)} size={Path(out).stat().st_size / 1e6:.2f}MB → {out}")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,20 @@ from __future__ import annotations
 import argparse
 from crypto_backtester.engine.db_utils import load_conf
 from crypto_backtester.engine.runner import run_backtest
+from crypto_backtester.engine.artifacts import ARTIFACT_FORMATS
+from crypto_backtester.strategies import get_strategy, list_strategies
+
+# 기존 CLI 플래그명 → 전략 파라미터명 (sma_cross는 short/long)
+_FLAG_ALIASES = {"short": "sma_short", "long": "sma_long"}
+
+def _parse_kv(items):
+    out = {}
+    for it in items or []:
+        k, sep, v = it.partition("=")
+        if not sep:
+            raise SystemExit(f"--param expects KEY=VALUE, got: {it}")
+        out[k.strip()] = v.strip()
+    return out
 
 def main():
     ap = argparse.ArgumentParser()
@@ -9,7 +23,7 @@ def main():
     ap.add_argument("--resolution", choices=["5m","1d"], required=True)
     ap.add_argument("--start", required=True)
     ap.add_argument("--end",   required=True, help="end exclusive")
-    ap.add_argument("--strategy", choices=["sma_cross","sma_macd_atr"], required=True)
+    ap.add_argument("--strategy", choices=list_strategies(), required=True)
 
     # params (선택적)
     ap.add_argument("--sma-short", type=int, default=20)
@@ -19,6 +33,14 @@ def main():
     ap.add_argument("--macd-signal", type=int, default=9)
     ap.add_argument("--atr-n", type=int, default=14)
     ap.add_argument("--atr-k", type=float, default=3.0)
+    ap.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                    help="전략 파라미터 직접 지정(반복 가능, 레지스트리 스키마 기준)")
+    ap.add_argument("--no-signal-cache", action="store_true", help="시그널 캐시 사용 안 함")
+
+    # 비용 민감도(fee×slip 그리드)
+    ap.add_argument("--cost-grid", action="store_true", help="conf sensitivity 그리드로 비용 민감도 표면 생성")
+    ap.add_argument("--fee-grid", type=str, default=None, help="예: 0,1,2,5,10 (지정 시 --cost-grid 포함)")
+    ap.add_argument("--slip-grid", type=str, default=None, help="예: 0,2,4,8 (지정 시 --cost-grid 포함)")
 
     ap.add_argument("--start-cash", type=float, default=10_000.0)
     ap.add_argument("--fee-bps", type=float, default=None, help="override")
@@ -30,6 +52,8 @@ def main():
     ap.add_argument("--exp-dir", type=str, default=None, help="실험 폴더 경로 (권장)")
     ap.add_argument("--local-only", action="store_true", help="실험기록 로컬 전용(= DB 로깅 강제 비활성화)")
     ap.add_argument("--notes", type=str, default="", help="실험 노트(리포트에 삽입)")
+    ap.add_argument("--artifact-format", choices=list(ARTIFACT_FORMATS), default=None,
+                    help="산출물 포맷(csv=개별 파일, npz=run.npz 단일 컬럼형). 기본: conf artifacts.format")
 
     args = ap.parse_args()
 
@@ -37,14 +61,21 @@ def main():
     fee_bps = args.fee_bps if args.fee_bps is not None else conf["fees_bps"]["taker"]
     slip_bps = args.slip_bps if args.slip_bps is not None else conf["slippage_bps"]["crypto"]
 
-    if args.strategy == "sma_cross":
-        params = {"short": args.sma_short, "long": args.sma_long}
-    else:
-        params = {
-            "sma_short": args.sma_short, "sma_long": args.sma_long,
-            "macd_fast": args.macd_fast, "macd_slow": args.macd_slow, "macd_signal": args.macd_signal,
-            "atr_n": args.atr_n, "atr_k": args.atr_k,
-        }
+    # 전략 스키마에 있는 파라미터만 CLI 플래그에서 채우고, --param으로 덮어쓴다
+    flags = vars(args)
+    params = {}
+    for k in get_strategy(args.strategy).params:
+        flag = _FLAG_ALIASES.get(k, k)
+        if flag in flags:
+            params[k] = flags[flag]
+    params.update(_parse_kv(args.param))
+
+    cost_grid = None
+    if args.cost_grid or args.fee_grid or args.slip_grid:
+        sens = conf.get("sensitivity", {}) or {}
+        fee_grid = [float(x) for x in args.fee_grid.split(",")] if args.fee_grid else sens.get("fee_bps", [fee_bps])
+        slip_grid = [float(x) for x in args.slip_grid.split(",")] if args.slip_grid else sens.get("slip_bps", [slip_bps])
+        cost_grid = {"fee_bps": fee_grid, "slip_bps": slip_grid}
 
     artifact_root = args.exp_dir if args.auto_report and args.exp_dir else None
 
@@ -53,7 +84,10 @@ def main():
         strategy_name=args.strategy, strategy_params=params,
         start_cash=args.start_cash, fee_bps=fee_bps, slip_bps=slip_bps,
         db_logging=(not args.no_db) and (not args.local_only),
-        artifact_root=artifact_root, save_fig=True
+        artifact_root=artifact_root, save_fig=True,
+        use_signal_cache=not args.no_signal_cache,
+        cost_grid=cost_grid,
+        artifact_format=args.artifact_format or (conf.get("artifacts", {}) or {}).get("format", "csv")
     )
 
     # 자동 리포트: 실험 폴더에 run 단위 서브폴더 생성/동기화
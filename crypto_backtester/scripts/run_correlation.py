@@ -0,0 +1,76 @@
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from crypto_backtester.engine.db_utils import get_engine
+from crypto_backtester.engine.correlation import (
+    load_returns, iter_rolling_corr, volatility_regime, corr_by_regime, corr_long,
+)
+
+# 롤링 출력 행 수(시점 × 자산쌍) 상한. 5m step=1이면 수백 자산에서 수십억 행이 되므로 기본 거부.
+MAX_OUTPUT_ROWS = 50_000_000
+
+def parse_assets(s: str):
+    # "crypto:BTCUSDT,crypto:ETHUSDT,equity:SPY" → [(market, symbol), ...]
+    out = []
+    for tok in s.split(","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        market, _, symbol = tok.partition(":")
+        if not symbol:
+            market, symbol = "crypto", market
+        out.append((market, symbol))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Rolling / regime correlation across bar tables.")
+    ap.add_argument("--assets", required=True, help="market:symbol,... (예: crypto:BTCUSDT,equity:SPY)")
+    ap.add_argument("--res", choices=["5m","1d"], default="1d")
+    ap.add_argument("--start", required=True)
+    ap.add_argument("--end",   required=True, help="end exclusive")
+    ap.add_argument("--resample", default=None, help="예: 15min (준실시간 갱신용)")
+    ap.add_argument("--window", type=int, default=60, help="롤링 윈도(바 수)")
+    ap.add_argument("--step", type=int, default=1, help="출력 간격(바 수)")
+    ap.add_argument("--regime-window", type=int, default=20)
+    ap.add_argument("--float32", action="store_true", help="수익률 행렬을 float32로 보관(대규모 자산)")
+    ap.add_argument("--allow-large", action="store_true", help=f"출력 행 수가 {MAX_OUTPUT_ROWS:,}를 넘어도 진행")
+    ap.add_argument("--out-dir", default="crypto_backtester/reports/correlation")
+    args = ap.parse_args()
+
+    eng = get_engine()
+    rets = load_returns(eng, parse_assets(args.assets), args.res, args.start, args.end,
+                        resample=args.resample, dtype=np.float32 if args.float32 else np.float64)
+    if len(rets) < args.window:
+        raise SystemExit(f"not enough bars: {len(rets)} < window={args.window}")
+
+    symbols = list(rets.columns)
+    n_points = (len(rets) - args.window) // args.step + 1
+    n_rows = n_points * len(symbols) * (len(symbols) - 1) // 2
+    if n_rows > MAX_OUTPUT_ROWS and not args.allow_large:
+        hint = " (5m라면 --step 288 = 일 단위 권장)" if args.res == "5m" and args.step == 1 else ""
+        raise SystemExit(f"rolling output too large: {n_points} points × {len(symbols)} assets "
+                         f"= {n_rows:,} rows > {MAX_OUTPUT_ROWS:,}{hint}; use --step or --allow-large")
+
+    labels = volatility_regime(rets, args.regime_window)
+    by_regime = corr_by_regime(rets, labels)
+
+    out = Path(args.out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    # 청크마다 long 포맷으로 바로 이어 쓴다(K×N×N 전체를 메모리에 두지 않음)
+    fp = out / f"rolling_w{args.window}.csv"
+    last = None
+    for i, (idx, mats) in enumerate(iter_rolling_corr(rets, args.window, step=args.step)):
+        corr_long(idx, mats, symbols, labels).to_csv(fp, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        last = mats[-1]
+    pd.DataFrame(last, index=symbols, columns=symbols).to_csv(out / "latest.csv")
+    for name, m in by_regime.items():
+        m.to_csv(out / f"regime_{name}.csv")
+
+    print(f"[corr] assets={len(symbols)} bars={len(rets)} points={n_points} "
+          f"regimes={sorted(by_regime)} → {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+import hashlib, importlib, inspect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+@dataclass(frozen=True)
+class StrategySpec:
+    name: str
+    fn: Callable[..., Any]                                  # generate_signals(df, **params) -> pd.Series(0/1)
+    params: Dict[str, Any] = field(default_factory=dict)    # 파라미터 스키마: 이름 → 기본값(타입은 기본값에서 유추)
+    version: str = ""                                       # 시그널 캐시 키에 포함(코드가 바뀌면 달라짐)
+
+_REGISTRY: Dict[str, StrategySpec] = {}
+_BUILTIN_MODULES = [
+    "crypto_backtester.strategies.sma_cross",
+    "crypto_backtester.strategies.sma_macd_atr",
+]
+_builtins_loaded = False
+
+def _source_version(fn: Callable[..., Any]) -> str:
+    """전략 모듈 소스(없으면 함수 소스)의 해시. 소스를 못 읽는 환경(zip, REPL)에서는 정규화된 이름."""
+    try:
+        src = inspect.getsource(inspect.getmodule(fn) or fn)
+    except (OSError, TypeError):
+        src = f"{fn.__module__}.{fn.__qualname__}"
+    return hashlib.sha1(src.encode("utf-8")).hexdigest()[:12]
+
+def register_strategy(name: str, params: Optional[Dict[str, Any]] = None, version: Optional[str] = None):
+    """
+    전략 등록 데코레이터. params를 생략하면 generate_signals 시그니처의 기본값(df 제외)을 스키마로 쓴다.
+    version을 생략하면 전략 모듈 소스 해시를 쓴다 — 전략 파일을 고치면 예전 캐시 시그널을 쓰지 않는다.
+    (모듈 밖 지표 코드 변경까지 반영하려면 version="2" 처럼 명시적으로 올린다)
+        @register_strategy("sma_cross")
+        def generate_signals(df, short: int = 20, long: int = 60): ...
+    """
+    def deco(fn):
+        schema = params
+        if schema is None:
+            sig = inspect.signature(fn)
+            schema = {k: p.default for k, p in list(sig.parameters.items())[1:]
+                      if p.default is not inspect.Parameter.empty}
+        _REGISTRY[name] = StrategySpec(name=name, fn=fn, params=dict(schema),
+                                       version=str(version) if version is not None else _source_version(fn))
+        return fn
+    return deco
+
+def _load_builtins() -> None:
+    global _builtins_loaded
+    if not _builtins_loaded:
+        for mod in _BUILTIN_MODULES:
+            importlib.import_module(mod)
+        _builtins_loaded = True
+
+def list_strategies() -> List[str]:
+    _load_builtins()
+    return sorted(_REGISTRY)
+
+def get_strategy(name: str) -> StrategySpec:
+    _load_builtins()
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"unknown strategy={name} (allowed: {sorted(_REGISTRY)})")
+
+def resolve_params(name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """기본값 위에 사용자 값을 덮어쓰고 기본값 타입으로 캐스팅. 스키마에 없는 키는 에러."""
+    spec = get_strategy(name)
+    params = dict(params or {})
+    unknown = sorted(set(params) - set(spec.params))
+    if unknown:
+        raise ValueError(f"unknown params for {name}: {unknown} (allowed: {sorted(spec.params)})")
+    out = {}
+    for k, default in spec.params.items():
+        v = params.get(k, default)
+        out[k] = type(default)(v) if default is not None and v is not None else v
+    return out
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import pandas as pd
+from crypto_backtester.strategies import register_strategy
 from crypto_backtester.engine.indicators import sma
 
+@register_strategy("sma_cross")
 def generate_signals(df: pd.DataFrame, short: int = 20, long: int = 60) -> pd.Series:
     """단순 SMA 크로스, long-only. t 신호 → t+1 체결을 위해 shift(1) 적용."""
     s = sma(df["close"], short)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import pandas as pd
+from crypto_backtester.strategies import register_strategy
 from crypto_backtester.engine.indicators import sma, macd, atr
 
+@register_strategy("sma_macd_atr")
 def generate_signals(
     df: pd.DataFrame,
     sma_short: int = 20,
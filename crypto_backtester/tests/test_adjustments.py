@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from crypto_backtester.engine.adjustments import (
+    action_multipliers, adjustment_factors, prev_close, adjusted_frame,
+)
+
+def _bars(n=30):
+    # equity 1d: UTC 자정 right-close 라벨
+    idx = pd.date_range("2025-01-02", periods=n, freq="D")
+    close = np.linspace(100, 130, n)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                         "volume": np.full(n, 1000.0)}, index=idx)
+
+ACTS = pd.DataFrame({
+    "ex_date": pd.to_datetime(["2025-01-20", "2025-01-10"]),      # 정렬되지 않은 입력
+    "kind": ["dividend", "split"], "ratio": [np.nan, 2.0], "amount": [1.5, np.nan],
+})
+
+def test_factors_match_naive_loop():
+    df = _bars()
+    ref = prev_close(df.index, df["close"], ACTS["ex_date"])
+    m = action_multipliers(ACTS["kind"], ACTS["ratio"], ACTS["amount"], ref)
+    assert np.isclose(m[1], 0.5) and np.isclose(m[0], 1 - 1.5 / df.loc["2025-01-20", "close"])
+    fac = adjustment_factors(df.index, ACTS["ex_date"], m)
+    naive = np.array([np.prod([mk for mk, e in zip(m, ACTS["ex_date"]) if t <= e]) for t in df.index])
+    assert np.allclose(fac, naive)
+    assert fac[-1] == 1.0 and np.isclose(fac[0], m[0] * m[1])
+
+def test_incremental_equals_full():
+    # 행위를 하나씩 곱해 나가도(증분) 한 번에 계산한 계수와 같다(순서 무관)
+    df = _bars()
+    full = adjusted_frame(df, ACTS)
+    step = df.copy()
+    for i in (1, 0):
+        one = ACTS.iloc[[i]]
+        m = action_multipliers(one["kind"], one["ratio"], one["amount"],
+                               prev_close(df.index, df["close"], one["ex_date"]))   # 원시 종가 기준
+        f = adjustment_factors(df.index, one["ex_date"], m)
+        for c in ("open", "high", "low", "close"):
+            step[c] = step[c] * f
+    pd.testing.assert_frame_equal(step, full)
+    assert (full["volume"] == df["volume"]).all()
+    # 권리락 이전 바는 조정 후 원시보다 낮다
+    assert full["close"].loc["2025-01-20"] < df["close"].loc["2025-01-20"]
+
+class _Conn:
+    """apply_adjustments용 가짜 연결: corp_action 1건(권리락 직전 바 없음)과 빈 equity_bars."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    def execute(self, q, params=None):
+        sql = " ".join(str(q).split())
+        self.log.append(sql)
+        rows = [(pd.Timestamp("2025-01-10").date(), "dividend", None, 1.0, None, None)] \
+            if sql.startswith("SELECT ex_date") else []
+        return type("R", (), {"rowcount": 0, "fetchall": lambda self: rows, "fetchone": lambda self: None})()
+
+def test_dividend_without_prior_bar_stays_pending():
+    from crypto_backtester.engine.adjustments import apply_adjustments
+    log = []
+    st = apply_adjustments(_Conn(log), asset_id=1)
+    assert st["deferred"] == 1 and st["actions"] == 0
+    assert not any("corp_action SET" in s for s in log)          # applied_ts는 NULL 유지
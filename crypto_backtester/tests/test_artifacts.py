@@ -0,0 +1,55 @@
+import json
+import numpy as np
+import pandas as pd
+from crypto_backtester.engine.artifacts import (
+    write_run_artifact, load_run_dir, pack_experiment, read_index, read_runs, read_orders,
+)
+
+def _run(rid, n=50, trades=2):
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    equity = pd.Series(10_000 + np.arange(n, dtype=float), index=idx, name="equity")
+    orders = [{"run_id": rid, "ts": idx[i].to_pydatetime().replace(tzinfo=None),
+               "side": "BUY" if i % 2 == 0 else "SELL", "symbol": "BTCUSDT", "res": "5m",
+               "qty": 0.1 * (i + 1), "price": 100.0 + i, "fee_bps": 5, "slippage_bps": 4}
+              for i in range(trades)]
+    return equity, orders, {"run_id": rid, "pnl": 0.01, "trades": trades // 2}
+
+def _write_csv_run(d, equity, orders, summary):
+    # runner.run_backtest(artifact_format="csv")와 같은 파일 구성
+    d.mkdir(parents=True)
+    equity.to_csv(d / "equity.csv", header=True)
+    pd.DataFrame(orders).to_csv(d / "orders.csv", index=False)
+    (d / "summary.json").write_text(json.dumps(summary), encoding="utf-8")
+
+def test_run_round_trip(tmp_path):
+    equity, orders, summary = _run("r1")
+    fp = write_run_artifact(tmp_path, equity, orders, summary)
+    run = load_run_dir(tmp_path)
+    assert run["summary"] == summary
+    assert run["equity"].equals(equity)
+    pd.testing.assert_frame_equal(run["orders"], pd.DataFrame(orders), check_dtype=False)   # 수치 열은 float64로 저장
+    assert list(read_orders(fp, columns=["price", "side"]).columns) == ["price", "side"]
+
+def test_run_without_orders(tmp_path):
+    equity, orders, summary = _run("r0", trades=0)
+    write_run_artifact(tmp_path / "npz", equity, orders, summary)
+    _write_csv_run(tmp_path / "csv", equity, orders, summary)
+    for d in ("npz", "csv"):
+        run = load_run_dir(tmp_path / d)
+        assert run["orders"].empty and len(run["equity"]) == len(equity)
+
+def test_pack_mixed_and_select_parts(tmp_path):
+    runs = tmp_path / "runs"
+    a, b = _run("a"), _run("b", trades=4)
+    write_run_artifact(runs / "a", *a)
+    _write_csv_run(runs / "b", *b)
+    fp = pack_experiment(tmp_path)
+    assert sorted(read_index(fp)["run_id"]) == ["a", "b"]
+    out = read_runs(fp)
+    assert out["a"]["equity"].equals(a[0])
+    assert np.allclose(out["b"]["equity"].to_numpy(), b[0].to_numpy())
+    sel = read_runs(fp, run_ids=["b"], parts=("orders",), order_columns=["ts", "qty"])
+    assert list(sel) == ["b"] and list(sel["b"]) == ["orders"]
+    o = sel["b"]["orders"]
+    assert list(o.columns) == ["ts", "qty"] and len(o) == 4
+    assert (o["ts"] == pd.DataFrame(b[1])["ts"]).all()
@@ -0,0 +1,94 @@
+import os, tempfile, threading, time
+import numpy as np
+import pandas as pd
+import pytest
+from crypto_backtester.engine.bar_server import BarServer, fetch_from_server, server_request, invalidate
+from crypto_backtester.engine.db_utils import fetch_bars
+
+def _series(n):
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    v = np.arange(n, dtype=float)
+    return pd.DataFrame({"open": v, "high": v + 1, "low": v - 1, "close": v + 0.5, "volume": v * 2}, index=idx)
+
+@pytest.fixture
+def server():
+    calls = []
+    gates = {}                                          # asset_id → Event: 설정되면 그 시리즈 적재를 막아 둔다
+
+    def loader(asset_id, res, market):                  # DB 대신 주입
+        calls.append((asset_id, res, market))
+        if asset_id in gates:
+            assert gates[asset_id].wait(5)
+        return _series(1000 * asset_id)
+
+    sock = os.path.join(tempfile.mkdtemp(), "bars.sock")
+    # 시리즈 1개 = 48B/bar → asset 1(48KB)·2(96KB)는 함께, 3(144KB)이 오면 축출 필요
+    srv = BarServer(sock, budget_mb=0.2, ttl_sec=600, loader=loader)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    deadline = time.time() + 5
+    while server_request("ping", sock=sock) is None:
+        if time.time() > deadline or not t.is_alive():
+            raise RuntimeError("bar server did not start")
+        time.sleep(0.01)
+    srv.gates = gates
+    yield srv, sock, calls
+    srv.shutdown()
+    t.join()
+
+def test_slice_matches_source_and_caches(server, monkeypatch):
+    srv, sock, calls = server
+    ref = _series(1000)
+    got = fetch_from_server(1, "5m", "2025-01-01 01:00", "2025-01-01T03:00:00+00:00", sock=sock)
+    pd.testing.assert_frame_equal(got, ref.loc["2025-01-01 01:00": "2025-01-01 02:55"], check_freq=False,
+                                  check_index_type=False, check_names=False)
+    # fetch_bars는 서버가 있으면 DB(engine)를 건드리지 않는다
+    monkeypatch.setenv("ES_BAR_SOCKET", sock)
+    df = fetch_bars(None, 1, "5m", "2025-01-01", "2025-01-02")
+    assert len(df) == 288 and calls == [(1, "5m", "crypto")]
+    df.iloc[0, 0] = -1.0                                # 클라이언트 쓰기는 자기 사본에만(copy-on-write)
+    assert fetch_bars(None, 1, "5m", "2025-01-01", "2025-01-02").iloc[0, 0] == 0.0
+
+def test_lru_eviction_under_budget(server):
+    srv, sock, calls = server
+    fetch_from_server(1, "5m", "2025-01-01", "2025-02-01", sock=sock)
+    fetch_from_server(2, "5m", "2025-01-01", "2025-02-01", sock=sock)
+    fetch_from_server(1, "5m", "2025-01-01", "2025-02-01", sock=sock)    # 1을 최근 사용으로
+    fetch_from_server(3, "5m", "2025-01-01", "2025-02-01", sock=sock)
+    st = server_request("stats", sock=sock)
+    assert [s["asset_id"] for s in st["series"]] == [1, 3]
+    assert st["used_bytes"] <= st["budget_bytes"] and st["evictions"] == 1
+
+def test_no_server_returns_none(tmp_path):
+    assert fetch_from_server(1, "5m", "2025-01-01", "2025-01-02", sock=str(tmp_path / "none.sock")) is None
+
+def test_cold_load_does_not_block_other_series(server):
+    srv, sock, calls = server
+    fetch_from_server(1, "5m", "2025-01-01", "2025-01-02", sock=sock)
+    srv.gates[2] = threading.Event()
+    slow = [threading.Thread(target=fetch_from_server, args=(2, "5m", "2025-01-01", "2025-01-02"),
+                             kwargs={"sock": sock}) for _ in range(3)]
+    for t in slow:
+        t.start()
+    while calls.count((2, "5m", "crypto")) == 0:
+        time.sleep(0.01)
+    t0 = time.time()
+    assert len(fetch_from_server(1, "5m", "2025-01-01", "2025-01-02", sock=sock)) == 288   # 적재 중에도 hit
+    assert time.time() - t0 < 1.0
+    srv.gates[2].set()
+    for t in slow:
+        t.join()
+    assert calls.count((2, "5m", "crypto")) == 1                                            # 같은 키는 1회 적재
+
+def test_invalidate_during_load_reloads(server):
+    srv, sock, calls = server
+    srv.gates[1] = threading.Event()
+    t = threading.Thread(target=fetch_from_server, args=(1, "5m", "2025-01-01", "2025-01-02"), kwargs={"sock": sock})
+    t.start()
+    while not calls:
+        time.sleep(0.01)
+    assert invalidate(1, "5m", sock=sock)                 # 업서트 후 알림(적재 중 결과는 낡은 것으로 처리)
+    srv.gates[1].set()
+    t.join()
+    assert calls.count((1, "5m", "crypto")) == 2
+    assert invalidate(1, "5m", sock=sock) and server_request("stats", sock=sock)["series"] == []
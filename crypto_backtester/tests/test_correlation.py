@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from crypto_backtester.engine.correlation import (
+    RollingCorrelation, rolling_corr, iter_rolling_corr, volatility_regime, corr_by_regime,
+)
+
+def _rets(T=500, N=4, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0, 0.01, size=(T, N))
+    x[:, 1] += 0.5 * x[:, 0]
+    idx = pd.date_range("2025-01-01", periods=T, freq="5min", tz="UTC")
+    return pd.DataFrame(x, index=idx, columns=[f"A{i}" for i in range(N)])
+
+def test_incremental_matches_numpy():
+    r = _rets()
+    rc = RollingCorrelation(r.shape[1], window=50, resync_every=77)
+    rc.update_many(r.to_numpy())
+    assert np.allclose(rc.corr(), np.corrcoef(r.to_numpy()[-50:].T))
+
+def test_batch_matches_pandas_rolling():
+    r = _rets()
+    idx, mats = rolling_corr(r, window=50, step=7)
+    ref = r.rolling(50).corr()
+    for k in (0, len(idx) // 2, len(idx) - 1):
+        assert np.allclose(mats[k], ref.loc[idx[k]].to_numpy())
+
+def test_regime_split_labels():
+    r = _rets()
+    labels = volatility_regime(r, 20)
+    out = corr_by_regime(r, labels)
+    assert set(out) == {"high", "low"}
+    assert out["low"].shape == (4, 4)
+
+def test_iter_chunks_match_batch():
+    r = _rets()
+    idx, mats = rolling_corr(r, window=50, step=3)
+    parts = list(iter_rolling_corr(r, window=50, step=3, chunk_points=16))
+    assert max(len(i) for i, _ in parts) == 16
+    assert pd.Index(np.concatenate([i for i, _ in parts])).equals(pd.Index(idx))
+    assert np.allclose(np.concatenate([m for _, m in parts]), mats, equal_nan=True)
+
+def test_load_returns_matches_pandas(monkeypatch):
+    import crypto_backtester.engine.correlation as corr
+    rng = np.random.default_rng(3)
+    frames = {}
+    for sym, start, n in (("A", "2025-01-01", 600), ("B", "2025-01-01 12:00", 400), ("C", "2025-01-01 00:05", 300)):
+        idx = pd.date_range(start, periods=n, freq="5min", tz="UTC", name="ts")
+        idx = idx[rng.random(n) > 0.1]                              # 결측 바
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+        close[3] = np.nan
+        frames[sym] = pd.DataFrame({"close": close}, index=idx)
+    monkeypatch.setattr(corr, "ensure_asset", lambda engine, symbol, market: symbol)
+    monkeypatch.setattr(corr, "fetch_bars", lambda engine, aid, *a, **k: frames[aid])
+    for resample in (None, "15min"):
+        px = pd.DataFrame({k: v["close"] for k, v in frames.items()}).sort_index()
+        if resample:
+            px = px.resample(resample, label="right", closed="right").last()
+        ref = np.log(px.ffill()).diff().fillna(0.0)
+        got = corr.load_returns(None, [("crypto", k) for k in frames], "5m", "", "", resample=resample,
+                                dtype=np.float32)
+        assert got.dtypes.eq(np.float32).all()
+        assert got.index.equals(ref.index) and list(got.columns) == list(ref.columns)
+        assert np.allclose(got.to_numpy(), ref.to_numpy(), atol=1e-6)
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+from crypto_backtester.engine.runner import _simulate, _metrics, _periods_per_year
+from crypto_backtester.engine.cost_sensitivity import extract_trades, cost_surface
+
+def _bars(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    sig = pd.Series((rng.random(n) < 0.5).astype(int), index=idx).rolling(5).max().fillna(0).astype(int)
+    return pd.DataFrame({"close": close}, index=idx), sig
+
+@pytest.mark.parametrize("liquidate", [True, False])
+def test_surface_matches_engine(liquidate):
+    # 메타모픽: 그리드의 각 (fee, slip) 지점이 실제 엔진 재실행 결과와 일치
+    df, sig = _bars()
+    fees, slips = [0.0, 5.0], [0.0, 4.0]
+    surf = cost_surface(extract_trades(df["close"], sig, liquidate), fees, slips, 10_000, _periods_per_year("5m"))
+    for i, f in enumerate(fees):
+        for j, s in enumerate(slips):
+            eq, orders = _simulate(df, sig, "X", "5m", 10_000, f, s, liquidate)
+            m = _metrics(eq, "5m")
+            for k in ("pnl", "sharpe", "mdd"):
+                assert np.isclose(surf[k][i, j], m[k], rtol=1e-9, atol=1e-12)
+    assert surf["trades"] == sum(o["side"] == "SELL" for o in orders)
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from crypto_backtester.engine.event_window import locate_events, event_windows, window_reactions
+
+def _bars(n=100):
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    close = np.arange(1, n + 1, dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1,
+                         "close": close, "volume": np.ones(n)}, index=idx)
+
+def test_locate_events_left_label():
+    b = _bars()
+    ev = pd.to_datetime(["2025-01-01 00:11", "2025-01-01 00:10", "2024-12-31 23:00"], utc=True)
+    anchor, ok = locate_events(b.index, ev, label="left")
+    assert list(anchor[:2]) == [2, 2]
+    assert list(ok) == [True, True, False]
+
+def test_windows_and_reactions():
+    b = _bars()
+    ev = pd.to_datetime(["2025-01-01 01:00", "2025-01-01 00:02"], utc=True)
+    win, valid = event_windows(b, ev, before=3, after=2)
+    assert win.shape == (2, 6, 5)
+    assert np.array_equal(win[0, :, 3], np.arange(10, 16, dtype=float))
+    assert np.isnan(win[1, 0, 3])                     # 데이터 시작 이전은 NaN 패딩
+    r = window_reactions(win, before=3)
+    assert np.isclose(r["ret_post"].iloc[0], 15 / 12 - 1)
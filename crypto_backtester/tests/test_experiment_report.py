@@ -0,0 +1,45 @@
+import csv, json
+from crypto_backtester.scripts.make_experiment_report import emit_experiment, emit_from_local
+
+def _run(root, rid, pnl=0.1):
+    d = root / "runs" / rid
+    d.mkdir(parents=True)
+    s = {"run_id": rid, "symbol": "BTCUSDT", "res": "5m", "strategy": "sma_cross",
+         "pnl": pnl, "sharpe": 1.0, "mdd": -0.1, "trades": 3,
+         "fee_bps": 5, "slip_bps": 2, "start": "2025-01-01", "end": "2025-02-01"}
+    (d / "summary.json").write_text(json.dumps(s), encoding="utf-8")
+    (d / "orders.csv").write_text("ts,side\n", encoding="utf-8")
+    return d
+
+def _ids(exp):
+    with (exp / "runs.csv").open(encoding="utf-8") as f:
+        return [r["run_id"] for r in csv.DictReader(f)]
+
+def test_batch_is_incremental_and_dedupes(tmp_path):
+    src, exp = tmp_path / "src", tmp_path / "exp"
+    for rid in ("r1", "r2"):
+        _run(src, rid)
+    assert emit_experiment(str(exp), str(src), notes="n") == {"runs": 2, "written": 2, "skipped": 0}
+    assert emit_experiment(str(exp), str(src)) == {"runs": 2, "written": 0, "skipped": 2}
+    assert "n" in (exp / "runs" / "r1" / "card.md").read_text(encoding="utf-8")   # notes 유지
+
+    # 산출물이 바뀐 run만 다시 생성
+    (src / "runs" / "r2" / "orders.csv").write_text("ts,side\n2025-01-01,BUY\n", encoding="utf-8")
+    assert emit_experiment(str(exp), str(src))["written"] == 1
+    emit_from_local(str(src / "runs" / "r1"), str(exp), notes="n")
+    assert _ids(exp) == ["r1", "r2"]
+
+def _emit_many(args):
+    src, exp, rids = args
+    for rid in rids:
+        emit_from_local(str(src / "runs" / rid), str(exp))
+
+def test_concurrent_single_runs_keep_every_row(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    src, exp = tmp_path / "src", tmp_path / "exp"
+    rids = [f"r{i:02d}" for i in range(40)]
+    for rid in rids:
+        _run(src, rid)
+    with ProcessPoolExecutor(8) as pool:                        # run_backtest --auto-report 동시 실행 재현
+        list(pool.map(_emit_many, [(src, exp, rids[i::8]) for i in range(8)]))
+    assert _ids(exp) == rids
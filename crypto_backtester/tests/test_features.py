@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pandas as pd
+from crypto_backtester.engine.features import DEFAULT_SPEC, build_feature_store, open_feature_store
+
+def _bars(n=500, start="2024-01-01", seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    idx = pd.date_range(start, periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close * 1.002, "low": close * 0.998, "close": close,
+                         "volume": rng.uniform(1, 10, n)}, index=idx)
+
+def test_round_trip_and_views(tmp_path):
+    df = _bars()
+    build_feature_store(df, tmp_path, "BTCUSDT", "5m")
+    fs = open_feature_store(tmp_path, None, "BTCUSDT", "5m")
+    assert len(fs) == len(df) and fs.X.dtype == np.float32
+    assert fs.X.shape[1] == len(fs.columns) == len(fs.manifest["columns"])
+    assert (np.asarray(fs.ts) == df.index.as_unit("ns").asi8).all()
+    w = fs.windows(16)
+    assert w.shape == (len(df) - 15, 16, fs.X.shape[1])
+    assert np.shares_memory(w, fs.X)
+    assert np.array_equal(w[3, :, 0], fs.X[3:19, 0], equal_nan=True)
+
+def test_valid_starts_and_batches(tmp_path):
+    df = _bars()
+    build_feature_store(df, tmp_path, "BTCUSDT", "5m")
+    fs = open_feature_store(tmp_path, None, "BTCUSDT", "5m")
+    win, h = 16, DEFAULT_SPEC["target_horizon"]
+    starts = fs.valid_starts(win)
+    warm = int(np.argmax(np.asarray(fs.valid)))                 # 지표 warm-up(NaN) 구간 길이
+    assert warm > 0 and starts[0] == warm
+    assert starts[-1] + win - 1 == len(df) - h - 1              # 라벨 없는 마지막 h바 제외
+    for s in starts[[0, len(starts) // 2, -1]]:
+        assert not np.isnan(fs.X[s: s + win]).any()
+
+    split = str(df.index[300].tz_localize(None))
+    xs, ys = zip(*fs.iter_batches(win, batch_size=64, end=split))
+    assert xs[0].shape == (64, win, fs.X.shape[1]) and ys[0].shape == (64,)
+    n_train = sum(len(y) for y in ys)
+    n_test = sum(len(y) for _, y in fs.iter_batches(win, batch_size=64, start=split))
+    assert n_train + n_test == len(starts)
+    assert n_train == int((starts + win - 1 < 300).sum())
+
+def test_each_bar_range_gets_its_own_version(tmp_path):
+    a = build_feature_store(_bars(500, "2024-01-01"), tmp_path, "BTCUSDT", "5m")
+    assert build_feature_store(_bars(500, "2024-01-01"), tmp_path, "BTCUSDT", "5m") == a
+    b = build_feature_store(_bars(800, "2025-01-01", seed=1), tmp_path, "BTCUSDT", "5m")
+    assert b != a and b.parent == a.parent
+    latest = open_feature_store(tmp_path, None, "BTCUSDT", "5m")               # 기본: 가장 최근 버전
+    assert len(latest) == 800
+    assert pd.Timestamp(latest.manifest["start"]) == pd.Timestamp("2025-01-01", tz="UTC")
+    assert len(open_feature_store(tmp_path, None, "BTCUSDT", "5m", data=a.name)) == 500   # 다른 job의 버전은 그대로
+
+def test_overwrite_keeps_open_mappings_valid(tmp_path):
+    df = _bars(2000)
+    path = build_feature_store(df, tmp_path, "BTCUSDT", "5m")
+    fs = open_feature_store(tmp_path, None, "BTCUSDT", "5m")
+    before = np.array(fs.X[-100:])
+    ino = os.stat(path / "X.npy").st_ino
+    assert build_feature_store(df, tmp_path, "BTCUSDT", "5m", overwrite=True) == path
+    assert os.stat(path / "X.npy").st_ino != ino                                # 제자리 truncate가 아니라 교체
+    assert np.array_equal(np.asarray(fs.X[-100:]), before, equal_nan=True)      # 열린 매핑은 예전 파일을 계속 읽음
+    assert [p.name for p in path.parent.iterdir()] == [path.name]               # 임시/예전 디렉터리 정리
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+from crypto_backtester.engine.db_utils import _fill_bars, _frame_from_rows
+
+def _rows(n=500):
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-01-01", periods=n, freq="5min")
+    v = rng.random((n, 5)).tolist()
+    v[7][2] = None                                   # NULL 컬럼
+    legacy = [(t.to_pydatetime(), *r) for t, r in zip(idx, v)]
+    epoch = [(int(t.timestamp()), *r) for t, r in zip(idx.tz_localize("UTC"), v)]
+    return legacy, epoch
+
+@pytest.mark.parametrize("n_hint", [0, 37, 500, 4000])   # COUNT 과소/정확/과대
+def test_streaming_fill_matches_fetchall(n_hint):
+    legacy, epoch = _rows()
+    ref = _frame_from_rows(legacy)
+    out = _fill_bars((epoch[i: i + 64] for i in range(0, len(epoch), 64)), n_hint=n_hint)
+    assert str(out.index.tz) == "UTC" and out.index.is_monotonic_increasing
+    assert np.array_equal(out.index.asi8, ref.index.as_unit("ns").asi8)
+    assert np.allclose(out.to_numpy(), ref.to_numpy(dtype=float), equal_nan=True)
+    assert np.isnan(out["low"].iloc[7])
+
+def test_empty():
+    assert _fill_bars(iter([]), n_hint=10).empty
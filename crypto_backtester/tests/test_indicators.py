@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
+import pytest
 from crypto_backtester.engine.indicators import sma, ema, rsi, atr, macd
+from crypto_backtester.engine.indicators import sma_bank, ema_bank, macd_bank, atr_bank, rolling_max_bank
 
 def test_sma_matches_pandas():
     s = pd.Series(range(1,11), dtype=float)
@@ -9,3 +12,44 @@ def test_macd_shapes():
     s = pd.Series(range(1,200), dtype=float)
     m, sig, h = macd(s, 12, 26, 9)
     assert len(m) == len(sig) == len(h) == len(s)
+
+# --------- 뱅크: 단일 함수와 같은 값/NaN 규칙 ---------
+def _bars(n=700, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    df = pd.DataFrame({"open": close, "close": close,
+                       "high": close * (1 + rng.random(n) * 0.01),
+                       "low": close * (1 - rng.random(n) * 0.01)},
+                      index=pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC"))
+    return df
+
+WINDOWS = [1, 2, 5, 16, 17, 26, 100, 5000]
+
+@pytest.mark.parametrize("nan_at", [None, "lead", "gap"])
+def test_sma_ema_banks_match_single(nan_at):
+    close = _bars()["close"]
+    if nan_at == "lead":
+        close.iloc[:40] = np.nan
+    elif nan_at == "gap":
+        close.iloc[300] = np.nan
+    sb, eb = sma_bank(close, WINDOWS), ema_bank(close, WINDOWS)
+    for n in WINDOWS:
+        pd.testing.assert_series_equal(sb[n], sma(close, n), check_names=False, rtol=1e-9)
+        pd.testing.assert_series_equal(eb[n], ema(close, n), check_names=False, rtol=1e-11)
+
+def test_macd_atr_max_banks_match_single():
+    df = _bars()
+    combos = [(12, 26, 9), (5, 35, 5)]
+    mb = macd_bank(df["close"], combos)
+    assert mb["hist"].shape == (len(df), len(combos))
+    for f, s, g in combos:
+        for field, ref in zip(("line", "signal", "hist"), macd(df["close"], f, s, g)):
+            pd.testing.assert_series_equal(mb[field, f, s, g], ref, check_names=False, rtol=1e-9, atol=1e-12)
+    ab = atr_bank(df, [3, 14])
+    for n in (3, 14):
+        pd.testing.assert_series_equal(ab[n], atr(df, n), check_names=False, rtol=1e-11)
+    high = df["high"].copy()
+    high.iloc[50] = np.nan
+    rb = rolling_max_bank(high, WINDOWS)
+    for n in WINDOWS:
+        pd.testing.assert_series_equal(rb[n], high.rolling(n, min_periods=n).max(), check_names=False)
@@ -0,0 +1,136 @@
+import json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+import pytest
+from crypto_backtester.scripts.ingest_binance_5m import (
+    STEP_MS, collect_closed, closed_end_ms, make_session, tail_symbol, to_ms,
+)
+
+T0 = to_ms("2025-01-01")
+
+class _FakeKlines(BaseHTTPRequestHandler):
+    # /api/v3/klines 규격을 흉내 내는 로컬 서버(T0부터 끊김 없는 5m 캔들)
+    def do_GET(self):
+        q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        start, end, limit = int(q["startTime"]), int(q["endTime"]), int(q["limit"])
+        first = max(T0, -(-start // STEP_MS) * STEP_MS)
+        rows = []
+        for t in range(first, end + 1, STEP_MS)[:limit]:
+            px = str(100 + (t - T0) // STEP_MS)
+            rows.append([t, px, px, px, px, "1.0", t + STEP_MS - 1, "0", 1, "0", "0", "0"])
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class _EmptyKlines(_FakeKlines):
+    # 거래 정지/상장 전 심볼: 항상 [] 응답, 요청 수 기록
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+def _serve(handler):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+@pytest.fixture
+def fake_server():
+    srv, url = _serve(_FakeKlines)
+    yield url
+    srv.shutdown()
+
+def test_collect_only_closed_candles(fake_server):
+    now = T0 + 2500 * STEP_MS + 90_000           # 2500번째 캔들 진행 중
+    with make_session() as sess:
+        df = collect_closed("BTCUSDT", T0, now, sess, base_url=fake_server)
+    assert len(df) == 2500                      # 3페이지(1000+1000+500) 합쳐 1배치
+    assert df.index[-1] == pd.Timestamp(closed_end_ms(now) - STEP_MS, unit="ms", tz="UTC")
+    assert df.index.is_unique and df.index.is_monotonic_increasing
+
+def test_collect_resumes_from_watermark(fake_server):
+    now = T0 + 10 * STEP_MS
+    with make_session() as sess:
+        df = collect_closed("BTCUSDT", T0 + 8 * STEP_MS, now, sess, base_url=fake_server)
+        assert list(df["close"]) == [108.0, 109.0]
+        assert collect_closed("BTCUSDT", now, now + 1, sess, base_url=fake_server).empty
+
+def test_empty_pages_skip_whole_window():
+    srv, url = _serve(_EmptyKlines)
+    try:
+        now = T0 + 2 * 288 * STEP_MS                    # 2일 뒤처진 심볼
+        with make_session() as sess:
+            assert collect_closed("HALTED", T0, now, sess, base_url=url, sleep=0.0).empty
+        assert _EmptyKlines.requests == 1               # 바 단위(576회)가 아니라 페이지 단위
+        with make_session() as sess:                    # 아주 오래 멈춘 심볼도 사이클당 max_pages회까지만
+            collect_closed("HALTED", T0, T0 + 400 * 288 * STEP_MS, sess, base_url=url, max_pages=3, sleep=0.0)
+        assert _EmptyKlines.requests == 1 + 3
+    finally:
+        srv.shutdown()
+
+class _Engine:
+    """tail_symbol용 가짜 엔진: begin() 트랜잭션별로 실행된 SQL을 기록한다."""
+
+    def __init__(self, watermark=None, max_ts=None):
+        self.watermark, self.max_ts = watermark, max_ts
+        self.txns = []
+
+    def begin(self):
+        eng, log = self, []
+
+        class _Txn:
+            def __enter__(self):
+                eng.txns.append(log)
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, q, params=None):
+                sql = " ".join(str(q).split())
+                log.append((sql, params))
+                row = None
+                if sql.startswith("SELECT last_ts"):
+                    row = (eng.watermark, None, "ok", None) if eng.watermark is not None else None
+                elif sql.startswith("SELECT MAX(ts)"):
+                    row = (eng.max_ts,)
+                return type("R", (), {"fetchone": lambda self: row})()
+        return _Txn()
+
+def test_tail_resumes_from_bars_and_commits_watermark_atomically(fake_server):
+    # 워터마크 없이 range 모드로 8바가 이미 적재된 상태 → now-1d가 아니라 MAX(ts) 다음부터
+    eng = _Engine(max_ts=pd.Timestamp(T0 + 7 * STEP_MS, unit="ms").to_pydatetime())
+    now = T0 + 12 * STEP_MS + 1000
+    with make_session() as sess:
+        n, last = tail_symbol(eng, 1, "BTCUSDT", sess, now, bootstrap_ms=T0 - 288 * STEP_MS,
+                              base_url=fake_server, sleep=0.0)
+    assert n == 4 and last == pd.Timestamp(T0 + 11 * STEP_MS, unit="ms", tz="UTC")
+    write = [t for t in eng.txns if any("INSERT" in sql for sql, _ in t)]
+    assert len(write) == 1                              # 바 업서트 + 워터마크가 한 트랜잭션
+    sqls = [sql for sql, _ in write[0]]
+    assert "crypto_bars" in sqls[0] and "ingest_status" in sqls[-1]
+    bars = write[0][0][1]
+    status = write[0][-1][1]
+    assert [b["close"] for b in bars] == [108.0, 109.0, 110.0, 111.0]
+    assert status["last_ts"] == last.tz_localize(None).to_pydatetime() and status["status"] == "ok"
+
+def test_tail_prefers_watermark(fake_server):
+    eng = _Engine(watermark=pd.Timestamp(T0 + 9 * STEP_MS, unit="ms").to_pydatetime(),
+                  max_ts=pd.Timestamp(T0 + 2 * STEP_MS, unit="ms").to_pydatetime())
+    with make_session() as sess:
+        n, _ = tail_symbol(eng, 1, "BTCUSDT", sess, T0 + 12 * STEP_MS, bootstrap_ms=T0,
+                           base_url=fake_server, sleep=0.0)
+    assert n == 2
+    assert not any(sql.startswith("SELECT MAX(ts)") for t in eng.txns for sql, _ in t)
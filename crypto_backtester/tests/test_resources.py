@@ -0,0 +1,56 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import crypto_backtester.engine.runner as runner
+from crypto_backtester.engine.resources import ResourceGovernor, estimate_bars, CHUNK_MIN, CHUNK_MAX
+
+def test_decisions_respect_budget():
+    g = ResourceGovernor(memory_mb=64, cpu=8)
+    # 작업당 추정 = 400B × 105,120바 ≈ 40MB → 64MB 예산엔 1개만
+    assert g.workers("backtest", bars_per_job=105_120) == 1
+    assert g.workers("backtest", bars_per_job=105_120, requested=8) == 8       # 명시값 우선, 권장값은 기록만
+    assert g.decisions[-1]["recommended"] == 1 and g.decisions[-1]["over_budget"] is True
+    assert g.workers("report", requested=20, io_bound=True) == 20
+    rows = g.fetch_chunk_rows(est_rows=420_000)
+    assert CHUNK_MIN <= rows <= CHUNK_MAX
+    assert g.decisions[-1]["over_budget"] is True
+    assert ResourceGovernor(memory_mb=1 << 20, cpu=4).upsert_chunk_rows() == CHUNK_MAX
+    assert estimate_bars("5m", "2025-01-01", "2025-01-02") == 288
+
+def test_report_includes_rss():
+    g = ResourceGovernor(memory_mb=256)
+    g.start_sampling()
+    g.fetch_chunk_rows()
+    rep = g.report()
+    assert rep["budget_mb"] == 256 and rep["decisions"][0]["what"] == "fetch_chunk_rows"
+    assert rep["rss"]["peak_mb"] >= rep["rss"]["start_mb"] > 0
+
+def _fake_db(monkeypatch, n=100):
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    close = 100 + np.sin(np.arange(n) / 5.0) * 5
+    bars = pd.DataFrame({c: close for c in ("open", "high", "low", "close")}, index=idx).assign(volume=1.0)
+    monkeypatch.setattr(runner, "get_engine", lambda: None)
+    monkeypatch.setattr(runner, "ensure_asset", lambda *a, **k: 1)
+    monkeypatch.setattr(runner, "fetch_bars", lambda *a, **k: bars)
+
+def test_run_backtest_stops_sampler_on_error(monkeypatch):
+    _fake_db(monkeypatch)
+    with pytest.raises(ValueError, match="unknown strategy"):
+        runner.run_backtest("BTCUSDT", "5m", "2025-01-01", "2025-01-02", "nope", {}, 10_000, 5, 4)
+    assert not [t for t in threading.enumerate() if t.name == "rss-sampler"]
+
+@pytest.mark.parametrize("fmt", ["csv", "npz"])
+def test_resources_reported_after_figures(tmp_path, monkeypatch, fmt):
+    from crypto_backtester.engine.artifacts import load_run_dir
+    _fake_db(monkeypatch, n=400)
+    events = []
+    savefig, report = runner.plt.savefig, ResourceGovernor.report
+    monkeypatch.setattr(runner.plt, "savefig", lambda *a, **k: (events.append("fig"), savefig(*a, **k))[1])
+    monkeypatch.setattr(ResourceGovernor, "report", lambda self: (events.append("report"), report(self))[1])
+    out = runner.run_backtest("BTCUSDT", "5m", "2025-01-01", "2025-01-03", "sma_cross", {"short": 5, "long": 20},
+                              10_000, 5, 4, artifact_root=str(tmp_path), use_signal_cache=False,
+                              cost_grid={"fee_bps": [0, 5], "slip_bps": [0, 4]}, artifact_format=fmt)
+    assert events.index("report") > max(i for i, e in enumerate(events) if e == "fig")
+    saved = load_run_dir(out["artifact_dir"])["summary"]
+    assert saved["resources"]["rss"]["peak_mb"] > 0 and saved["resources"]["bars"] == 400
@@ -0,0 +1,53 @@
+import os, time
+import numpy as np
+import pandas as pd
+import pytest
+from crypto_backtester.strategies import StrategySpec, _REGISTRY, get_strategy, resolve_params
+from crypto_backtester.engine.signal_cache import SignalCache, compute_signals
+
+def _bars(n=200):
+    close = 100 + np.sin(np.arange(n) / 10.0)
+    idx = pd.date_range("2025-01-01", periods=n, freq="5min", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close,
+                         "volume": np.ones(n)}, index=idx)
+
+def test_resolve_params_casts_and_rejects():
+    p = resolve_params("sma_macd_atr", {"sma_short": "10", "atr_k": 2})
+    assert p["sma_short"] == 10 and isinstance(p["sma_short"], int)
+    assert p["atr_k"] == 2.0 and isinstance(p["atr_k"], float)
+    assert p["sma_long"] == get_strategy("sma_macd_atr").params["sma_long"]
+    with pytest.raises(ValueError, match="unknown params"):
+        resolve_params("sma_cross", {"shrot": 5})
+
+def test_cache_hit_skips_generate_signals(tmp_path, monkeypatch):
+    calls = []
+    def gen(df, n: int = 3):
+        calls.append(n)
+        return (df["close"] > df["close"].rolling(n).mean()).astype(int)
+    get_strategy("sma_cross")                                   # 내장 전략 먼저 로드
+    monkeypatch.setitem(_REGISTRY, "counting", StrategySpec("counting", gen, {"n": 3}, version="v1"))
+    cache, df = SignalCache(tmp_path), _bars()
+    first = compute_signals(df, "counting", {"n": 5}, cache=cache)
+    again = compute_signals(df, "counting", {"n": 5}, cache=cache)   # 수수료/슬리피지만 다른 재실행
+    assert calls == [5] and again.equals(first)
+    monkeypatch.setitem(_REGISTRY, "counting", StrategySpec("counting", gen, {"n": 3}, version="v2"))
+    compute_signals(df, "counting", {"n": 5}, cache=cache)          # 전략 코드가 바뀌면 재계산
+    assert calls == [5, 5]
+
+def test_builtin_strategies_have_source_version():
+    assert get_strategy("sma_cross").version and get_strategy("sma_cross").version != get_strategy("sma_macd_atr").version
+
+def test_evict_by_age_then_lru_size(tmp_path):
+    cache = SignalCache(tmp_path, max_mb=1e9, max_age_days=30)
+    now = time.time()
+    for i, age in enumerate([3 * 86400, 300, 200, 100]):
+        key = f"{i:02d}" + "0" * 62
+        cache.put(key, np.zeros(1000, dtype=np.int8))
+        os.utime(cache._path(key), (now - age, now - age))
+    cache.max_age = 86400                                       # put 안의 evict가 미리 지우지 않도록 나중에 설정
+    assert cache.evict() == 1 and not cache._path("00" + "0" * 62).exists()
+    size = cache._path("01" + "0" * 62).stat().st_size
+    cache.max_bytes = 2 * size                                  # 3개 중 가장 오래 안 쓴 1개 제거
+    assert cache.evict() == 1
+    assert not cache._path("01" + "0" * 62).exists()
+    assert cache._path("02" + "0" * 62).exists() and cache._path("03" + "0" * 62).exists()